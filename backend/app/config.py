@@ -19,6 +19,9 @@ class Settings(BaseSettings):
     INSTAGRAM_VERIFY_TOKEN: str = ""  # Custom token for Meta webhook hub verification
     GMAIL_ADDRESS: str = ""  # Gmail address to send maintenance emails from
     GMAIL_APP_PASSWORD: str = ""  # Gmail App Password (16-char, from Google Account → Security → App Passwords)
+    REVIEW_CONCURRENCY: int = 10  # max application reviews talking to Claude at once
+    ANALYSIS_MODEL: str = "claude-haiku-4-5"  # maintenance-request classification model
+    PDF_BACKEND: str = "pypdf"  # or "pymupdf": faster, but AGPL and not in requirements.txt (pip install pymupdf)
 
     model_config = {"env_file": (".env", ".env.local"), "extra": "ignore"}
 
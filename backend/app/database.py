@@ -1,10 +1,46 @@
-from typing import AsyncGenerator
+import logging
+from typing import Any, AsyncGenerator
 
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from supabase import create_client, Client
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+try:
+    from postgrest import base_request_builder as _postgrest_responses
+except ImportError:  # module layout is a postgrest internal and may move
+    _postgrest_responses = None
+
+
+class _OrjsonJSONAdapter:
+    """
+    postgrest decodes every response body through a pydantic TypeAdapter(JSON),
+    which is ~10x slower than orjson on our row payloads. Decode with orjson
+    and defer to the original adapter for bodies orjson rejects (e.g. the empty
+    body of a return=minimal write), so its ValidationError fallback still applies.
+    """
+
+    _fallback = getattr(_postgrest_responses, "JSONAdapter", None)
+
+    @classmethod
+    def validate_json(cls, content: bytes) -> Any:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return cls._fallback.validate_json(content)
+
+
+if _OrjsonJSONAdapter._fallback is not None:
+    _postgrest_responses.JSONAdapter = _OrjsonJSONAdapter
+else:
+    logger.warning(
+        "postgrest.base_request_builder.JSONAdapter not found; "
+        "Supabase responses will be decoded without orjson"
+    )
+
 # Supabase client
 supabase: Client = create_client(
     settings.SUPABASE_URL.rstrip("/"), settings.SUPABASE_SERVICE_ROLE_KEY
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -18,6 +19,9 @@ from app.routes.stripe import router as stripe_router
 from app.routes.listings import router as listings_router
 from app.routes.test_workflow import router as test_workflow_router
 from app.routes.whatsapp import router as whatsapp_router
+from app.services.context_document_loader import load_lease_context_documents
+from app.services.context_loader import flush_agent_actions
+from app.services.http_client import close_http_client
 
 logging.basicConfig(level=logging.INFO)
 
@@ -25,7 +29,12 @@ logging.basicConfig(level=logging.INFO)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logging.getLogger(__name__).info("PropAI Backend starting up")
+    # Parse (or load the cached) lease context documents before the first
+    # prospect message needs them
+    await asyncio.to_thread(load_lease_context_documents)
     yield
+    await flush_agent_actions()
+    await close_http_client()
 
 
 app = FastAPI(title="PropAI Backend", version="0.1.0", lifespan=lifespan)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import httpx
 from fastapi import APIRouter, Request
 from fastapi.responses import Response
 
+from app.services.http_client import get_http_client
+
 router = APIRouter(tags=["frontend_proxy"])
 
 FRONTEND_ORIGIN = "http://localhost:3000"
@@ -13,8 +14,8 @@ async def _proxy(path: str, request: Request) -> Response:
     url = f"{FRONTEND_ORIGIN}/{path}"
     if request.query_params:
         url += f"?{request.query_params}"
-    async with httpx.AsyncClient(follow_redirects=True, timeout=15) as client:
-        resp = await client.get(url, headers={"host": "localhost:3000"})
+    client = await get_http_client()
+    resp = await client.get(url, headers={"host": "localhost:3000"})
     content_type = resp.headers.get("content-type", "text/html")
     return Response(content=resp.content, status_code=resp.status_code, media_type=content_type)
 
@@ -5,6 +5,7 @@ from datetime import date
 from fastapi import APIRouter, BackgroundTasks, Request, Response
 
 from app.config import settings
+from app.services.context_loader import append_summary_entry
 from app.services.instagram_dm_service import send_instagram_dm
 from app.services.prospect_agent_loop import run_prospect_agent_loop
 from app.services.prospect_context_loader import (
@@ -124,7 +125,7 @@ async def _process_and_reply_instagram(
             f'Prospect: "{user_message[:100]}". '
             f'Agent: "{reply_message[:100]}".'
         )
-        updated = (prev + "\n" + new_entry).strip()[-1000:]
+        updated = append_summary_entry(prev, new_entry)
         await update_prospect(prospect_ctx.prospect_id, {"conversation_summary": updated})
 
     except Exception as exc:
@@ -6,14 +6,14 @@ from fastapi import APIRouter, BackgroundTasks, HTTPException
 from pydantic import BaseModel
 
 from app.config import settings
+from app.database import supabase
 from app.services.twilio_service import send_whatsapp_message
 
 router = APIRouter(tags=["lease_applications"])
 
 
 def _sb():
-    from supabase import create_client
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 class ApplicationCreate(BaseModel):
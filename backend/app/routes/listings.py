@@ -3,10 +3,9 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException
-from supabase import create_client
 
-from app.config import settings
-from app.services.context_loader import log_conversation
+from app.database import supabase
+from app.services.context_loader import invalidate_tenant_context, log_conversation
 from app.services.lease_expiry_service import (
     check_expiring_leases,
     check_unanswered_inquiries,
@@ -18,7 +17,7 @@ router = APIRouter(prefix="/api/test", tags=["test"])
 
 
 def _sb():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 def _fmt_date(iso: str) -> str:
@@ -131,7 +130,7 @@ async def simulate_tenant_reply(lease_id: str, message: str = "no"):
         from fastapi import HTTPException
         raise HTTPException(status_code=400, detail="No tenant WhatsApp")
 
-    ctx = await load_tenant_context(phone)
+    ctx = await load_tenant_context(phone, bypass_cache=True)
     if not ctx:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Could not load tenant context")
@@ -180,6 +179,7 @@ async def reset_lease_for_testing(lease_id: str):
 
     sb.table("conversations").delete().eq("lease_id", lease_id).execute()
     sb.table("conversation_context").delete().eq("lease_id", lease_id).execute()
+    invalidate_tenant_context(lease_id)
 
     return {"success": True, "lease_id": lease_id, "note": "Lease reset. Conversations and context cleared."}
 
@@ -9,6 +9,7 @@ import anthropic
 from fastapi import APIRouter, HTTPException
 
 from app.config import settings
+from app.database import supabase
 from app.services.application_review_agent import (
     _load_lease_template,
     _upload_lease_preview_pdf,
@@ -19,8 +20,7 @@ router = APIRouter(prefix="/api/property-applications", tags=["property-applicat
 
 
 def _sb():
-    from supabase import create_client
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 _IMAGE_MEDIA_TYPES = {
@@ -10,9 +10,9 @@ import logging
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Header, status
-from supabase import create_client
 
 from app.config import settings
+from app.database import supabase
 from app.schemas.renewals import (
     InitiateRenewalRequest,
     LandlordDecisionRequest,
@@ -46,8 +46,7 @@ async def _get_verified_user(authorization: str = Header(...)) -> dict[str, Any]
         return {"id": "internal", "email": "internal@propai.system"}
 
     try:
-        sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
-        user_res = sb.auth.get_user(token)
+        user_res = supabase.auth.get_user(token)
         if not user_res or not user_res.user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
         return {"id": user_res.user.id, "email": user_res.user.email}
@@ -134,8 +133,7 @@ async def record_landlord_decision(
     Record landlord's decision on a negotiation log entry.
     accept → close as renewed | counter → update proposed rent | reject → trigger listing
     """
-    from supabase import create_client as _create
-    sb = _create(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    sb = supabase
 
     offer_res = sb.table("renewal_offers").select("*, leases(unit_id)").eq("id", offer_id).single().execute()
     if not offer_res.data:
@@ -199,8 +197,7 @@ async def get_renewal_dashboard(
     - Pending offers + negotiation history
     - Revenue at risk / revenue opportunity summary
     """
-    from supabase import create_client as _create
-    sb = _create(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    sb = supabase
 
     # Fetch leases for this landlord
     leases_res = (
@@ -1,30 +1,95 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import functools
+import hashlib
 import io
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from xml.sax.saxutils import escape as xml_escape
 
-from fastapi import APIRouter, HTTPException
+import httpx
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from PIL import Image as PILImage
 from pydantic import BaseModel
+from reportlab import rl_config
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import (
+    HRFlowable,
+    Image,
+    Paragraph,
+    Preformatted,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+from supabase import Client, ClientOptions, create_client
 
 from app.config import settings
 
 router = APIRouter(tags=["signing"])
+logger = logging.getLogger(__name__)
+
+# Our flowables are built from trusted, fixed code paths; skip ReportLab's
+# per-attribute shape validation.
+rl_config.shapeChecking = 0
+
+# Shared HTTP/2 transport for PostgREST + Storage so the sequential calls in a
+# signing request multiplex over one TLS connection instead of reconnecting.
+_http_client = httpx.Client(
+    http2=True,
+    timeout=60.0,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=10),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _sb() -> Client:
+    return create_client(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_SERVICE_ROLE_KEY,
+        options=ClientOptions(httpx_client=_http_client),
+    )
+
 
+_SECTION_HEADER_RE = re.compile(r"^\d+[\.\)]\s+[A-Z]")
 
-def _sb():
-    from supabase import create_client
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+_SIGNING_PAGE_COLUMNS = "prospect_name, unit_address, monthly_rent, lease_content, signed_at, expires_at"
 
 
 class SignRequest(BaseModel):
     signature_data_url: str
 
 
+def _is_expired(iso_str: str | None) -> bool:
+    """True if the timestamp is in the past; missing or unparseable values never expire."""
+    if not iso_str:
+        return False
+    try:
+        # Python 3.11+ fromisoformat accepts the trailing "Z" PostgREST may return
+        return datetime.fromisoformat(iso_str) < datetime.now(timezone.utc)
+    except (TypeError, ValueError):
+        return False
+
+
 @router.get("/api/sign/{token}")
 async def get_signing_page_data(token: str):
     sb = _sb()
-    res = sb.table("signing_tokens").select("*").eq("id", token).maybe_single().execute()
+    res = await asyncio.to_thread(
+        sb.table("signing_tokens").select(_SIGNING_PAGE_COLUMNS).eq("id", token).maybe_single().execute
+    )
     if not res or not res.data:
         raise HTTPException(status_code=404, detail="Signing link not found")
 
@@ -33,14 +98,8 @@ async def get_signing_page_data(token: str):
     if row.get("signed_at"):
         raise HTTPException(status_code=410, detail="This document has already been signed")
 
-    expires_at = row.get("expires_at")
-    if expires_at:
-        try:
-            exp = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
-            if exp < datetime.now(timezone.utc):
-                raise HTTPException(status_code=410, detail="This signing link has expired")
-        except ValueError:
-            pass
+    if _is_expired(row.get("expires_at")):
+        raise HTTPException(status_code=410, detail="This signing link has expired")
 
     return {
         "token": token,
@@ -52,77 +111,186 @@ async def get_signing_page_data(token: str):
 
 
 @router.post("/api/sign/{token}")
-async def submit_signature(token: str, body: SignRequest):
+async def submit_signature(token: str, body: SignRequest, background_tasks: BackgroundTasks):
     sb = _sb()
-    token_res = sb.table("signing_tokens").select("*").eq("id", token).maybe_single().execute()
-    if not token_res or not token_res.data:
-        raise HTTPException(status_code=404, detail="Signing link not found")
+    sig_png = _decode_signature_image(body.signature_data_url)
+    signed_at = datetime.now(timezone.utc).isoformat()
 
-    row = token_res.data
+    # Public URLs are derived locally from the object path, so the token can be
+    # claimed with its final URLs in one conditional UPDATE; the row only needs
+    # patching afterwards if an upload fails.
+    pdf_filename = f"signed_lease_{token[:8]}_{datetime.now().strftime('%Y%m%d')}.pdf"
+    signature_path = f"signatures/{token}.png"
+    bucket = sb.storage.from_("leases-signed")
+    pdf_url = bucket.get_public_url(pdf_filename)
+    signature_url = bucket.get_public_url(signature_path) if sig_png else None
+
+    claim_res = await asyncio.to_thread(
+        sb.table("signing_tokens").update({
+            "signature_url": signature_url,
+            "signed_at": signed_at,
+            "pdf_url": pdf_url,
+        })
+        .eq("id", token)
+        .is_("signed_at", "null")
+        .gt("expires_at", signed_at)
+        .execute
+    )
+    if not claim_res or not claim_res.data:
+        await _raise_unclaimable(sb, token)
 
-    if row.get("signed_at"):
+    row = claim_res.data[0]
+    prospect_id = row.get("prospect_id")
+    prospect_phone = row.get("prospect_phone", "")
+
+    # Phase A: everything that doesn't depend on the stored PDF URL runs at once.
+    uploaded_pdf_url, uploaded_signature_url, _, lease_id = await asyncio.gather(
+        asyncio.to_thread(_generate_and_upload_signed_pdf, sb, pdf_filename, row, sig_png),
+        asyncio.to_thread(_upload_signature_png, sb, signature_path, sig_png),
+        asyncio.to_thread(_mark_prospect_signed, sb, prospect_id, signed_at),
+        asyncio.to_thread(_find_tenant_lease_id, sb, prospect_phone),
+    )
+
+    # The raw data URL is only kept when there is no stored PDF, since that is
+    # the one case where the frontend has to re-render the document from it.
+    if uploaded_pdf_url is None or uploaded_signature_url != signature_url:
+        await asyncio.to_thread(
+            sb.table("signing_tokens").update({
+                "signature_url": uploaded_signature_url,
+                "signature_data_url": body.signature_data_url if uploaded_pdf_url is None else None,
+                "pdf_url": uploaded_pdf_url,
+            }).eq("id", token).execute
+        )
+    pdf_url = uploaded_pdf_url
+
+    # Phase B: the signature is recorded, so the side effects that reference the
+    # PDF URL run concurrently after the response has gone out.
+    background_tasks.add_task(_run_post_signing_effects, sb, row, lease_id, pdf_url)
+
+    return {"signed": True, "pdf_url": pdf_url}
+
+
+async def _raise_unclaimable(sb, token: str) -> None:
+    """Work out why a token could not be claimed and raise the matching error."""
+    res = await asyncio.to_thread(
+        sb.table("signing_tokens").select("signed_at").eq("id", token).maybe_single().execute
+    )
+    if not res or not res.data:
+        raise HTTPException(status_code=404, detail="Signing link not found")
+    if res.data.get("signed_at"):
         raise HTTPException(status_code=410, detail="Already signed")
+    raise HTTPException(status_code=410, detail="Signing link has expired")
+
+
+def _mark_prospect_signed(sb, prospect_id: str | None, signed_at: str) -> None:
+    if prospect_id:
+        sb.table("prospects").update({"status": "signed", "updated_at": signed_at}).eq("id", prospect_id).execute()
 
-    expires_at = row.get("expires_at")
-    if expires_at:
-        try:
-            exp = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
-            if exp < datetime.now(timezone.utc):
-                raise HTTPException(status_code=410, detail="Signing link has expired")
-        except ValueError:
-            pass
 
-    pdf_url: str | None = None
+def _find_tenant_lease_id(sb, prospect_phone: str) -> str | None:
+    if not prospect_phone:
+        return None
     try:
-        pdf_bytes = _generate_signed_lease_pdf(row, body.signature_data_url)
-        filename = f"signed_lease_{token[:8]}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        sb.storage.from_("leases-signed").upload(filename, pdf_bytes, {"content-type": "application/pdf", "upsert": "true"})
-        pdf_url = sb.storage.from_("leases-signed").get_public_url(filename)
+        tenant_res = (
+            sb.table("tenants")
+            .select("lease_id")
+            .eq("whatsapp_number", prospect_phone)
+            .maybe_single()
+            .execute()
+        )
+        if tenant_res and tenant_res.data:
+            return tenant_res.data.get("lease_id")
     except Exception as exc:
-        import traceback
-        print(f"Signed PDF generation/upload error: {exc}")
-        traceback.print_exc()
+        logger.warning("Failed to look up tenant lease: %s", exc)
+    return None
 
-    signed_at = datetime.now(timezone.utc).isoformat()
 
-    sb.table("signing_tokens").update({
-        "signature_data_url": body.signature_data_url,
-        "signed_at": signed_at,
-        "pdf_url": pdf_url,
-    }).eq("id", token).execute()
+async def _run_post_signing_effects(sb, token_row: dict, lease_id: str | None, pdf_url: str | None) -> None:
+    results = await asyncio.gather(
+        _activate_tenant_lease(sb, lease_id, pdf_url),
+        _notify_landlord_signed(token_row, pdf_url),
+        _send_signed_confirmation(token_row, pdf_url),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Post-signing side effect failed: %s", result)
 
-    prospect_id = row.get("prospect_id")
-    if prospect_id:
-        sb.table("prospects").update({"status": "signed", "updated_at": signed_at}).eq("id", prospect_id).execute()
 
-    # Activate the lease associated with this tenant
-    prospect_phone = row.get("prospect_phone", "")
-    if prospect_phone:
-        try:
-            tenant_res = (
-                sb.table("tenants")
-                .select("lease_id")
-                .eq("whatsapp_number", prospect_phone)
-                .maybe_single()
-                .execute()
-            )
-            if tenant_res and tenant_res.data and tenant_res.data.get("lease_id"):
-                lease_id = tenant_res.data["lease_id"]
-                sb.table("leases").update({
-                    "status": "active",
-                    "lease_document_url": pdf_url,
-                }).eq("id", lease_id).execute()
-                print(f"Lease {lease_id} activated after signing")
-        except Exception as exc:
-            print(f"Failed to activate lease: {exc}")
-
-    _notify_landlord_signed(row, pdf_url)
-    await _send_signed_confirmation(row, pdf_url)
+async def _activate_tenant_lease(sb, lease_id: str | None, pdf_url: str | None) -> None:
+    """Activate the lease associated with the signing tenant."""
+    if not lease_id:
+        return
+    try:
+        await asyncio.to_thread(
+            sb.table("leases").update({
+                "status": "active",
+                "lease_document_url": pdf_url,
+            }).eq("id", lease_id).execute
+        )
+        logger.info("Lease %s activated after signing", lease_id)
+    except Exception as exc:
+        logger.warning("Failed to activate lease: %s", exc)
 
-    return {"signed": True, "pdf_url": pdf_url}
 
+async def _activate_lease_from_signing(token_row: dict, sb) -> str | None:
+    """Create the lease, tenant and unit_status records for a signed application.
 
-def _generate_signed_lease_pdf(token_row: dict, signature_data_url: str) -> bytes:
+    All reads and writes happen server-side in the activate_lease_from_signing
+    Postgres function (migrations/003), so this is one round trip and atomic.
+    """
+    if not token_row.get("id") or not token_row.get("application_id"):
+        return None
+    try:
+        res = await asyncio.to_thread(
+            sb.rpc("activate_lease_from_signing", {
+                "p_token_id": token_row["id"],
+                "p_pdf_url": token_row.get("pdf_url"),
+            }).execute
+        )
+        return res.data
+    except Exception as exc:
+        logger.warning("Failed to activate lease from signing: %s", exc)
+    return None
+
+
+def _generate_and_upload_signed_pdf(
+    sb, filename: str, token_row: dict, sig_png: bytes | None
+) -> str | None:
+    """Render the signed PDF and push it to storage; blocking, so run it in a worker thread."""
+    try:
+        pdf_buf = _render_signed_lease_pdf(token_row, sig_png)
+        # storage3 streams BufferedReader bodies in chunks instead of needing
+        # a bytes copy of the whole document
+        sb.storage.from_("leases-signed").upload(
+            filename, io.BufferedReader(pdf_buf), {"content-type": "application/pdf", "upsert": "true"}
+        )
+        return sb.storage.from_("leases-signed").get_public_url(filename)
+    except Exception:
+        logger.exception("Signed PDF generation/upload error")
+    return None
+
+
+def _upload_signature_png(sb, path: str, png_bytes: bytes | None) -> str | None:
+    """Store the decoded signature as a PNG object and return its public URL."""
+    if not png_bytes:
+        return None
+    try:
+        sb.storage.from_("leases-signed").upload(path, png_bytes, {"content-type": "image/png", "upsert": "true"})
+        return sb.storage.from_("leases-signed").get_public_url(path)
+    except Exception as exc:
+        logger.warning("Signature image upload error: %s", exc)
+    return None
+
+
+def _render_signed_lease_pdf(
+    token_row: dict, sig_png: bytes | None, sig_text: str | None = None
+) -> io.BytesIO:
+    """
+    Render the signed lease into a buffer positioned at the start. sig_text is
+    the typed signature recorded by the conversational flow, shown when there
+    is no drawn signature image.
+    """
     today_str = datetime.now(timezone.utc).strftime("%d %B %Y at %H:%M UTC")
     prospect_name = token_row.get("prospect_name", "Tenant")
     unit_address = token_row.get("unit_address", "")
@@ -130,77 +298,58 @@ def _generate_signed_lease_pdf(token_row: dict, signature_data_url: str) -> byte
     lease_content = token_row.get("lease_content", "")
     token_id = token_row.get("id", "")
 
-    sig_image = _decode_signature_image(signature_data_url)
-
     buf = io.BytesIO()
-    story = _build_pdf_story(
+    story = _build_signed_story(
         lease_content=lease_content,
         prospect_name=prospect_name,
         unit_address=unit_address,
         monthly_rent=monthly_rent,
         signed_at=today_str,
-        token_id=token_id,
-        sig_image=sig_image,
+        sig_png=sig_png,
+        sig_text=sig_text,
     )
-    _render_pdf(buf, story)
-    return buf.getvalue()
+    _render_pdf(buf, story, date_str=today_str, token_id=token_id)
+    buf.seek(0)
+    return buf
+
+
+@functools.lru_cache(maxsize=1)
+def _pdf_styles() -> dict:
+    styles = getSampleStyleSheet()
+
+    return {
+        "title": ParagraphStyle("title", parent=styles["Normal"], fontSize=15, fontName="Helvetica-Bold", textColor=colors.black, alignment=TA_CENTER, spaceAfter=4),
+        "section": ParagraphStyle("section", parent=styles["Normal"], fontSize=11, fontName="Helvetica-Bold", textColor=colors.black, alignment=TA_LEFT, spaceBefore=8, spaceAfter=3),
+        "body": ParagraphStyle("body", parent=styles["Normal"], fontSize=10, leading=15, alignment=TA_JUSTIFY, spaceAfter=4),
+        "meta_label": ParagraphStyle("meta_label", parent=styles["Normal"], fontSize=10, fontName="Helvetica-Bold", textColor=colors.HexColor("#333333")),
+        "meta_value": ParagraphStyle("meta_value", parent=styles["Normal"], fontSize=10, textColor=colors.black),
+        "sig_note": ParagraphStyle("sig_note", parent=styles["Normal"], fontSize=8, textColor=colors.HexColor("#666666"), alignment=TA_CENTER),
+    }
 
 
-def _build_pdf_story(
+def _build_pdf_story_common(
     lease_content: str,
     prospect_name: str,
     unit_address: str,
     monthly_rent,
-    signed_at: str | None = None,
-    token_id: str = "",
-    sig_image: io.BytesIO | None = None,
+    st: dict,
 ) -> list:
-    import re
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import mm
-    from reportlab.lib import colors
-    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-    from reportlab.platypus import Paragraph, Spacer, HRFlowable, Table, TableStyle, Image
-
-    styles = getSampleStyleSheet()
-
-    title_style = ParagraphStyle("title", parent=styles["Normal"], fontSize=15, fontName="Helvetica-Bold", textColor=colors.black, alignment=TA_CENTER, spaceAfter=4)
-    section_style = ParagraphStyle("section", parent=styles["Normal"], fontSize=11, fontName="Helvetica-Bold", textColor=colors.black, alignment=TA_LEFT, spaceBefore=8, spaceAfter=3)
-    body_style = ParagraphStyle("body", parent=styles["Normal"], fontSize=10, leading=15, alignment=TA_JUSTIFY, spaceAfter=4)
-    meta_label_style = ParagraphStyle("meta_label", parent=styles["Normal"], fontSize=10, fontName="Helvetica-Bold", textColor=colors.HexColor("#333333"))
-    meta_value_style = ParagraphStyle("meta_value", parent=styles["Normal"], fontSize=10, textColor=colors.black)
-    header_left_style = ParagraphStyle("hdr_left", parent=styles["Normal"], fontSize=9, textColor=colors.HexColor("#555555"), alignment=TA_LEFT)
-    header_right_style = ParagraphStyle("hdr_right", parent=styles["Normal"], fontSize=9, textColor=colors.HexColor("#555555"), alignment=TA_RIGHT)
-    footer_style = ParagraphStyle("footer", parent=styles["Normal"], fontSize=8, textColor=colors.HexColor("#888888"), alignment=TA_CENTER)
-    sig_note_style = ParagraphStyle("sig_note", parent=styles["Normal"], fontSize=8, textColor=colors.HexColor("#666666"), alignment=TA_CENTER)
+    """Title, key-info table and lease body, up to the SIGNATURES heading."""
 
     PAGE_W = 170 * mm  # usable width (210mm A4 minus 20mm margins each side)
 
     story = []
 
-    # ── Header: company left, date right ──
-    date_str = signed_at or datetime.now(timezone.utc).strftime("%d %B %Y")
-    header_table = Table(
-        [[Paragraph("PropAI Property Management", header_left_style),
-          Paragraph(date_str, header_right_style)]],
-        colWidths=[PAGE_W * 0.6, PAGE_W * 0.4],
-    )
-    header_table.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "MIDDLE")]))
-    story.append(header_table)
-    story.append(Spacer(1, 5 * mm))
-    story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor("#222222")))
-    story.append(Spacer(1, 5 * mm))
-
     # ── Document title ──
-    story.append(Paragraph("TENANCY AGREEMENT", title_style))
+    story.append(Paragraph("TENANCY AGREEMENT", st["title"]))
     story.append(Spacer(1, 5 * mm))
 
     # ── Key-info table ──
     rent_str = f"£{float(monthly_rent):.2f}" if monthly_rent else "As agreed"
     info_rows = [
-        [Paragraph("TENANT", meta_label_style), Paragraph(prospect_name, meta_value_style)],
-        [Paragraph("PROPERTY", meta_label_style), Paragraph(unit_address or "—", meta_value_style)],
-        [Paragraph("MONTHLY RENT", meta_label_style), Paragraph(rent_str, meta_value_style)],
+        [Paragraph("TENANT", st["meta_label"]), Paragraph(prospect_name, st["meta_value"])],
+        [Paragraph("PROPERTY", st["meta_label"]), Paragraph(unit_address or "—", st["meta_value"])],
+        [Paragraph("MONTHLY RENT", st["meta_label"]), Paragraph(rent_str, st["meta_value"])],
     ]
     info_table = Table(info_rows, colWidths=[PAGE_W * 0.28, PAGE_W * 0.72])
     info_table.setStyle(TableStyle([
@@ -213,22 +362,11 @@ def _build_pdf_story(
     story.append(info_table)
     story.append(Spacer(1, 6 * mm))
 
-    # ── Lease body: detect numbered section headers ──
-    section_header_re = re.compile(r"^\d+[\.\)]\s+[A-Z]")
-    for block in lease_content.split("\n\n"):
-        block = block.strip()
-        if not block:
-            continue
-        lines = block.splitlines()
-        first_line = lines[0].strip()
-        if section_header_re.match(first_line):
-            # Bold header line, then body for the rest
-            story.append(Paragraph(first_line, section_style))
-            rest = "\n".join(lines[1:]).strip()
-            if rest:
-                story.append(Paragraph(rest.replace("\n", "<br/>"), body_style))
-        else:
-            story.append(Paragraph(block.replace("\n", "<br/>"), body_style))
+    # ── Lease body ──
+    for block in _lease_body_blocks(lease_content):
+        for style_key, text, frags in block:
+            style = st[style_key]
+            story.append(Preformatted(text, style) if frags is None else Paragraph(text, style, frags=frags))
         story.append(Spacer(1, 1 * mm))
 
     story.append(Spacer(1, 8 * mm))
@@ -236,21 +374,17 @@ def _build_pdf_story(
     story.append(Spacer(1, 5 * mm))
 
     # ── Signatures ──
-    story.append(Paragraph("SIGNATURES", title_style))
+    story.append(Paragraph("SIGNATURES", st["title"]))
     story.append(Spacer(1, 5 * mm))
 
-    LINE = "_" * 42
+    return story
 
-    if sig_image:
-        tenant_sig_content = Image(sig_image, width=55 * mm, height=18 * mm)
-    else:
-        tenant_sig_content = Paragraph("<i>AWAITING TENANT SIGNATURE</i>", sig_note_style)
 
-    tenant_label = Paragraph(
-        f"<b>Tenant:</b> {prospect_name}" + (f"<br/>Signed: {signed_at}" if signed_at else ""),
-        sig_note_style,
-    )
-    landlord_label = Paragraph("<b>Landlord / Agent</b><br/>Signature: " + LINE, sig_note_style)
+def _signature_table(tenant_sig_content, st: dict):
+    PAGE_W = 170 * mm
+    LINE = "_" * 42
+
+    landlord_label = Paragraph("<b>Landlord / Agent</b><br/>Signature: " + LINE, st["sig_note"])
 
     sig_table = Table(
         [[tenant_sig_content, landlord_label]],
@@ -266,66 +400,192 @@ def _build_pdf_story(
         ("TOPPADDING", (0, 0), (-1, -1), 8),
         ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
     ]))
-    story.append(sig_table)
+    return sig_table
+
+
+def _build_signed_story(
+    lease_content: str,
+    prospect_name: str,
+    unit_address: str,
+    monthly_rent,
+    signed_at: str,
+    sig_png: bytes | None,
+    sig_text: str | None = None,
+) -> list:
+
+    st = _pdf_styles()
+    story = _build_pdf_story_common(lease_content, prospect_name, unit_address, monthly_rent, st)
+
+    if sig_png:
+        # BytesIO over immutable bytes shares the buffer rather than copying it
+        tenant_sig_content = Image(io.BytesIO(sig_png), width=55 * mm, height=18 * mm)
+    elif sig_text:
+        tenant_sig_content = Paragraph(xml_escape(sig_text).replace("\n", "<br/>"), st["sig_note"])
+    else:
+        tenant_sig_content = Paragraph("<i>AWAITING TENANT SIGNATURE</i>", st["sig_note"])
+
+    story.append(_signature_table(tenant_sig_content, st))
     story.append(Spacer(1, 4 * mm))
-    story.append(tenant_label)
+    story.append(Paragraph(f"<b>Tenant:</b> {prospect_name}<br/>Signed: {signed_at}", st["sig_note"]))
+    return story
 
-    story.append(Spacer(1, 8 * mm))
-    story.append(HRFlowable(width="100%", thickness=0.5, color=colors.HexColor("#cccccc")))
-    story.append(Spacer(1, 3 * mm))
-    story.append(Paragraph(
-        "This tenancy agreement has been digitally signed via PropAI. "
-        "The digital signature is legally binding under the Electronic Communications Act 2000.",
-        footer_style,
-    ))
-    if token_id:
-        story.append(Paragraph(f"Document ref: {token_id[:8]}", footer_style))
 
+def _build_preview_story(
+    lease_content: str,
+    prospect_name: str,
+    unit_address: str,
+    monthly_rent,
+) -> list:
+
+    st = _pdf_styles()
+    story = _build_pdf_story_common(lease_content, prospect_name, unit_address, monthly_rent, st)
+
+    awaiting = Paragraph("<i>AWAITING TENANT SIGNATURE</i>", st["sig_note"])
+    story.append(_signature_table(awaiting, st))
+    story.append(Spacer(1, 4 * mm))
+    story.append(Paragraph(f"<b>Tenant:</b> {prospect_name}", st["sig_note"]))
     return story
 
 
-def _render_pdf(buf: io.BytesIO, story: list) -> None:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import mm
-    from reportlab.platypus import SimpleDocTemplate
+@functools.lru_cache(maxsize=64)
+def _lease_body_blocks(lease_content: str) -> tuple:
+    """
+    Split the lease body into blocks of (style_key, text, frags) parts.
+    Most leases share the same template text, so the split, width checks and
+    Paragraph markup parse are memoised. Only the parsed frags are shared:
+    flowables are still built fresh per PDF because ReportLab stores layout
+    state on them.
+    """
+    page_w = 170 * mm
+    st = _pdf_styles()
+    blocks = []
+    for block in lease_content.split("\n\n"):
+        block = block.strip()
+        if not block:
+            continue
+        lines = block.splitlines()
+        first_line = lines[0].strip()
+        if _SECTION_HEADER_RE.match(first_line):
+            # Bold header line, then body for the rest
+            parts = [_text_part(first_line, "section", st, page_w)]
+            rest = "\n".join(lines[1:]).strip()
+            if rest:
+                parts.append(_text_part(rest, "body", st, page_w))
+        else:
+            parts = [_text_part(block, "body", st, page_w)]
+        blocks.append(tuple(parts))
+    return tuple(blocks)
+
+
+def _text_part(text: str, style_key: str, st: dict, width: float) -> tuple:
+    """Plain text whose lines all fit the frame skips Paragraph's markup parser (frags is None)."""
+    style = st[style_key]
+    if "<" not in text and "&" not in text and all(
+        stringWidth(line, style.fontName, style.fontSize) <= width for line in text.split("\n")
+    ):
+        return (style_key, text, None)
+    text = text.replace("\n", "<br/>")
+    return (style_key, text, Paragraph(text, style).frags)
+
+
+def _render_pdf(buf: io.BytesIO, story: list, date_str: str, token_id: str = "") -> None:
+    page_w, page_h = A4
+
+    # Fixed page chrome is drawn straight onto the canvas rather than laid out
+    # as Paragraph/Table flowables.
+    def _draw_chrome(canv, doc) -> None:
+        canv.saveState()
+        canv.setFont("Helvetica", 9)
+        canv.setFillColor(colors.HexColor("#555555"))
+        canv.drawString(20 * mm, page_h - 15 * mm, "PropAI Property Management")
+        canv.drawRightString(page_w - 20 * mm, page_h - 15 * mm, date_str)
+        canv.setStrokeColor(colors.HexColor("#222222"))
+        canv.setLineWidth(1)
+        canv.line(20 * mm, page_h - 17 * mm, page_w - 20 * mm, page_h - 17 * mm)
+
+        canv.setFont("Helvetica", 8)
+        canv.setFillColor(colors.HexColor("#888888"))
+        canv.drawCentredString(page_w / 2, 13 * mm, "This tenancy agreement has been digitally signed via PropAI.")
+        canv.drawCentredString(
+            page_w / 2, 9.5 * mm,
+            "The digital signature is legally binding under the Electronic Communications Act 2000.",
+        )
+        if token_id:
+            canv.drawCentredString(page_w / 2, 6 * mm, f"Document ref: {token_id[:8]}")
+        canv.restoreState()
 
     doc = SimpleDocTemplate(
         buf, pagesize=A4,
         leftMargin=20 * mm, rightMargin=20 * mm,
         topMargin=20 * mm, bottomMargin=20 * mm,
+        pageCompression=1,
+        invariant=1,
     )
-    doc.build(story)
+    doc.build(story, onFirstPage=_draw_chrome, onLaterPages=_draw_chrome)
 
 
-def _decode_signature_image(data_url: str) -> io.BytesIO | None:
+def _decode_signature_image(data_url: str) -> bytes | None:
+    """Decode a data-URL signature into 1-bit PNG bytes (signatures are monochrome ink)."""
     try:
-        if "," not in data_url:
+        _, sep, encoded = data_url.partition(",")
+        if not sep:
             return None
-        _, encoded = data_url.split(",", 1)
-        return io.BytesIO(base64.b64decode(encoded))
+        img = PILImage.open(io.BytesIO(base64.b64decode(encoded)))
+        if img.mode in ("RGBA", "LA", "P"):
+            # Flatten onto white first so transparent canvas pixels don't turn black
+            img = img.convert("RGBA")
+            flat = PILImage.new("RGB", img.size, "white")
+            flat.paste(img, mask=img.getchannel("A"))
+            img = flat
+        # Threshold rather than dither: anti-aliased stroke edges would
+        # otherwise turn into a speckle of scattered dots
+        bw = img.convert("L").point(lambda p: 255 if p > 128 else 0)
+        out = io.BytesIO()
+        bw.convert("1", dither=PILImage.Dither.NONE).save(out, "PNG", optimize=True)
+        return out.getvalue()
     except Exception:
         return None
 
 
-def _notify_landlord_signed(token_row: dict, pdf_url: str | None) -> None:
+# The signing flow notifies the account's landlord; that row practically never
+# changes, so remember it for a few minutes instead of re-selecting per signing.
+_LANDLORD_ID_TTL = 300.0
+_landlord_id_cache: tuple[float, str] | None = None
+
+
+async def _get_notify_landlord_id(sb) -> str | None:
+    global _landlord_id_cache
+    now = time.monotonic()
+    if _landlord_id_cache and _landlord_id_cache[0] > now:
+        return _landlord_id_cache[1]
+    landlords_res = await asyncio.to_thread(sb.table("landlords").select("id").limit(1).execute)
+    if not landlords_res or not landlords_res.data:
+        return None
+    landlord_id = landlords_res.data[0]["id"]
+    _landlord_id_cache = (now + _LANDLORD_ID_TTL, landlord_id)
+    return landlord_id
+
+
+async def _notify_landlord_signed(token_row: dict, pdf_url: str | None) -> None:
     try:
         sb = _sb()
-        landlords_res = sb.table("landlords").select("*").limit(1).execute()
-        if landlords_res and landlords_res.data:
-            landlord = landlords_res.data[0]
+        landlord_id = await _get_notify_landlord_id(sb)
+        if landlord_id:
             pdf_str = f" Signed PDF: {pdf_url}" if pdf_url else ""
-            sb.table("landlord_notifications").insert({
-                "landlord_id": landlord["id"],
-                "notification_type": "general",
-                "message": (
-                    f"{token_row.get('prospect_name', 'Applicant')} has signed their tenancy agreement"
-                    + (f" for {token_row.get('unit_address', '')}" if token_row.get("unit_address") else "")
-                    + f".{pdf_str}"
-                ),
-                "requires_signature": False,
-            }).execute()
+            await asyncio.to_thread(
+                sb.table("landlord_notifications").insert({
+                    "landlord_id": landlord_id,
+                    "notification_type": "general",
+                    "message": (
+                        f"{token_row.get('prospect_name', 'Applicant')} has signed their tenancy agreement"
+                        + (f" for {token_row.get('unit_address', '')}" if token_row.get("unit_address") else "")
+                        + f".{pdf_str}"
+                    ),
+                    "requires_signature": False,
+                }).execute
+            )
     except Exception as exc:
-        print(f"Landlord signed notification error: {exc}")
+        logger.warning("Landlord signed notification error: %s", exc)
 
 
 async def _send_signed_confirmation(token_row: dict, pdf_url: str | None) -> None:
@@ -350,7 +610,43 @@ async def _send_signed_confirmation(token_row: dict, pdf_url: str | None) -> Non
         else:
             await send_whatsapp_message(wa_number, body)
     except Exception as exc:
-        print(f"Failed to send signed confirmation via WhatsApp: {exc}")
+        logger.warning("Failed to send signed confirmation via WhatsApp: %s", exc)
+
+
+# Preview PDFs are pure functions of their inputs (plus the header date), so
+# keep recently rendered bytes around in a small LRU bounded by total size.
+_PREVIEW_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_preview_cache: OrderedDict[bytes, bytes] = OrderedDict()
+_preview_cache_bytes = 0
+# Previews are rendered from asyncio.to_thread workers, so every read and
+# write of the LRU and its byte count happens under this lock
+_preview_cache_lock = threading.Lock()
+
+
+def _preview_cache_key(
+    applicant_name: str,
+    unit_address: str,
+    monthly_rent: float | None,
+    lease_content: str,
+    date_str: str,
+) -> bytes:
+    raw = f"{date_str}|{applicant_name}|{unit_address}|{monthly_rent}|{lease_content}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).digest()
+
+
+def _preview_cache_put(key: bytes, pdf_bytes: bytes) -> None:
+    global _preview_cache_bytes
+    if len(pdf_bytes) > _PREVIEW_CACHE_MAX_BYTES:
+        return
+    with _preview_cache_lock:
+        previous = _preview_cache.pop(key, None)
+        if previous is not None:
+            _preview_cache_bytes -= len(previous)
+        _preview_cache[key] = pdf_bytes
+        _preview_cache_bytes += len(pdf_bytes)
+        while _preview_cache_bytes > _PREVIEW_CACHE_MAX_BYTES:
+            _, evicted = _preview_cache.popitem(last=False)
+            _preview_cache_bytes -= len(evicted)
 
 
 def generate_lease_preview_pdf(
@@ -360,15 +656,23 @@ def generate_lease_preview_pdf(
     lease_content: str,
 ) -> bytes:
     """Generate an unsigned lease agreement PDF for sending as a preview."""
+    date_str = datetime.now(timezone.utc).strftime("%d %B %Y")
+    key = _preview_cache_key(applicant_name, unit_address, monthly_rent, lease_content, date_str)
+    with _preview_cache_lock:
+        cached = _preview_cache.get(key)
+        if cached is not None:
+            _preview_cache.move_to_end(key)
+    if cached is not None:
+        return cached
+
     buf = io.BytesIO()
-    story = _build_pdf_story(
+    story = _build_preview_story(
         lease_content=lease_content,
         prospect_name=applicant_name,
         unit_address=unit_address,
         monthly_rent=monthly_rent,
-        signed_at=None,
-        token_id="",
-        sig_image=None,
     )
-    _render_pdf(buf, story)
-    return buf.getvalue()
+    _render_pdf(buf, story, date_str=date_str)
+    pdf_bytes = buf.getvalue()
+    _preview_cache_put(key, pdf_bytes)
+    return pdf_bytes
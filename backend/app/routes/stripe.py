@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import time
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
@@ -19,13 +21,27 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/payments", tags=["stripe"])
 
+# The pay page calls /pay-info and then /create-checkout-session back to back,
+# so keep the joined payment details around briefly. Entries are dropped as
+# soon as a payment is confirmed.
+_PAYMENT_DETAILS_TTL = 30.0
+_PAYMENT_DETAILS_MAX = 1024
+_payment_details_cache: dict[str, tuple[float, dict]] = {}
+
 
 def _get_payment_with_details(payment_id: UUID) -> dict:
     """Fetch a payment row with nested lease → unit and tenant data."""
+    key = str(payment_id)
+    now = time.monotonic()
+    cached = _payment_details_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
     result = (
         supabase.table("payments")
         .select(
-            "*, leases(id, unit_id, "
+            "id, lease_id, status, amount_due, due_date, "
+            "leases(id, unit_id, "
             "units(unit_identifier), "
             "tenants(full_name, is_primary_tenant))"
         )
@@ -42,20 +58,47 @@ def _get_payment_with_details(payment_id: UUID) -> dict:
     tenants_list = lease_data.get("tenants") or []
     primary = next((t for t in tenants_list if t.get("is_primary_tenant")), None)
 
-    return {
+    info = {
         "row": row,
         "tenant_name": primary["full_name"] if primary else "Tenant",
         "unit_identifier": unit_data.get("unit_identifier", "Unknown"),
         "amount_due": float(row["amount_due"]),
     }
 
+    if len(_payment_details_cache) >= _PAYMENT_DETAILS_MAX:
+        for stale in [k for k, (expires, _) in _payment_details_cache.items() if expires <= now]:
+            _payment_details_cache.pop(stale, None)
+        if len(_payment_details_cache) >= _PAYMENT_DETAILS_MAX:
+            _payment_details_cache.pop(next(iter(_payment_details_cache)), None)
+    _payment_details_cache[key] = (now + _PAYMENT_DETAILS_TTL, info)
+    return info
+
+
+def _get_payment_status(payment_id: UUID) -> str:
+    """Uncached status read. Payments can be settled outside this router (manual/bank records)."""
+    result = (
+        supabase.table("payments")
+        .select("status")
+        .eq("id", str(payment_id))
+        .single()
+        .execute()
+    )
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return result.data["status"]
+
 
 @router.get("/{payment_id}/pay-info", response_model=PaymentInfoResponse)
 async def get_payment_info(payment_id: UUID):
-    info = _get_payment_with_details(payment_id)
+    # Cached details, uncached status: a payment settled elsewhere must not
+    # still show as payable
+    info, status = await asyncio.gather(
+        asyncio.to_thread(_get_payment_with_details, payment_id),
+        asyncio.to_thread(_get_payment_status, payment_id),
+    )
     row = info["row"]
 
-    if row["status"] in ("paid",):
+    if status in ("paid",):
         raise HTTPException(status_code=400, detail="This payment has already been completed")
 
     return PaymentInfoResponse(
@@ -65,21 +108,26 @@ async def get_payment_info(payment_id: UUID):
         unit_identifier=info["unit_identifier"],
         amount_due=info["amount_due"],
         due_date=row["due_date"],
-        status=row["status"],
+        status=status,
     )
 
 
 @router.post("/{payment_id}/create-checkout-session", response_model=CheckoutSessionResponse)
 async def create_checkout(payment_id: UUID, req: CheckoutSessionRequest):
-    info = _get_payment_with_details(payment_id)
-    row = info["row"]
+    # The nested details may come from the cache; the status must not, or a
+    # payment recorded elsewhere in the last 30s could be charged twice
+    info, status = await asyncio.gather(
+        asyncio.to_thread(_get_payment_with_details, payment_id),
+        asyncio.to_thread(_get_payment_status, payment_id),
+    )
 
-    if row["status"] in ("paid",):
+    if status in ("paid",):
         raise HTTPException(status_code=400, detail="This payment has already been completed")
 
     amount_pence = int(round(info["amount_due"] * 100))
 
-    session = create_checkout_session(
+    session = await asyncio.to_thread(
+        create_checkout_session,
         payment_id=str(payment_id),
         amount_pence=amount_pence,
         tenant_name=info["tenant_name"],
@@ -96,27 +144,36 @@ async def create_checkout(payment_id: UUID, req: CheckoutSessionRequest):
 
 @router.post("/{payment_id}/confirm-stripe", response_model=ConfirmPaymentResponse)
 async def confirm_stripe_payment(payment_id: UUID, req: ConfirmPaymentRequest):
-    # Check if already paid (idempotent)
-    payment_row = (
-        supabase.table("payments")
-        .select("*")
-        .eq("id", str(payment_id))
-        .single()
-        .execute()
-        .data
+    # Look up the payment and verify the Stripe session concurrently; the
+    # Stripe result is only consulted if the payment isn't already paid.
+    payment_res, session = await asyncio.gather(
+        asyncio.to_thread(
+            supabase.table("payments")
+            .select("id, lease_id, status, amount_due")
+            .eq("id", str(payment_id))
+            .single()
+            .execute
+        ),
+        asyncio.to_thread(retrieve_checkout_session, req.session_id),
+        return_exceptions=True,
     )
+    if isinstance(payment_res, BaseException):
+        raise payment_res
+    payment_row = payment_res.data
     if not payment_row:
         raise HTTPException(status_code=404, detail="Payment not found")
 
+    # Idempotent: a payment that is already recorded short-circuits
     if payment_row["status"] == "paid":
+        _payment_details_cache.pop(str(payment_id), None)
         return ConfirmPaymentResponse(
             success=True,
             message="Payment already recorded",
             receipt_sent=False,
         )
 
-    # Verify with Stripe
-    session = retrieve_checkout_session(req.session_id)
+    if isinstance(session, BaseException):
+        raise session
 
     if session.payment_status != "paid":
         raise HTTPException(status_code=400, detail="Payment not completed on Stripe")
@@ -133,6 +190,7 @@ async def confirm_stripe_payment(payment_id: UUID, req: ConfirmPaymentRequest):
             reference=req.session_id,
         )
     )
+    _payment_details_cache.pop(str(payment_id), None)
 
     return ConfirmPaymentResponse(
         success=True,
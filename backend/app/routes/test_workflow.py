@@ -7,7 +7,6 @@ from sqlalchemy import text
 from typing import Dict, Any
 from app.database import get_db
 import uuid
-from datetime import datetime
 
 router = APIRouter(prefix="/api/test", tags=["test"])
 
@@ -40,25 +39,25 @@ async def create_simple_maintenance(
 async def check_tables(db: AsyncSession = Depends(get_db)):
     """Check if required tables exist"""
     try:
-        tables = {}
+        names = ["maintenance_requests", "maintenance_workflows", "workflow_communications"]
 
-        try:
-            result = await db.execute(text("SELECT COUNT(*) FROM maintenance_requests"))
-            tables['maintenance_requests'] = {"exists": True, "count": result.scalar()}
-        except Exception:
-            tables['maintenance_requests'] = {"exists": False, "count": 0}
+        # A missing table would abort the whole COUNT query, so check existence first
+        result = await db.execute(text(
+            "SELECT " + ", ".join(f"to_regclass('{name}') IS NOT NULL" for name in names)
+        ))
+        existing = [name for name, exists in zip(names, result.fetchone()) if exists]
 
-        try:
-            result = await db.execute(text("SELECT COUNT(*) FROM maintenance_workflows"))
-            tables['maintenance_workflows'] = {"exists": True, "count": result.scalar()}
-        except Exception:
-            tables['maintenance_workflows'] = {"exists": False, "count": 0}
+        counts = {}
+        if existing:
+            result = await db.execute(text(
+                "SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {name})" for name in existing)
+            ))
+            counts = dict(zip(existing, result.fetchone()))
 
-        try:
-            result = await db.execute(text("SELECT COUNT(*) FROM workflow_communications"))
-            tables['workflow_communications'] = {"exists": True, "count": result.scalar()}
-        except Exception:
-            tables['workflow_communications'] = {"exists": False, "count": 0}
+        tables = {
+            name: {"exists": name in counts, "count": counts.get(name, 0)}
+            for name in names
+        }
 
         return {"success": True, "tables": tables}
     except Exception as e:
@@ -1,20 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
-from urllib.parse import unquote_plus
+from datetime import date
+from urllib.parse import parse_qsl
 
 from fastapi import APIRouter, BackgroundTasks, Request, Response
 
 from app.config import settings
+from app.database import supabase
 from app.services.agent_loop import run_agent_loop
 from app.services.context_loader import (
     TenantContext,
+    append_summary_entry,
     clear_pending_media_urls,
     load_tenant_context,
-    log_agent_action,
     log_conversation,
+    record_agent_turn,
     save_pending_media_urls,
-    update_conversation_context,
 )
 from app.services.prospect_context_loader import (
     load_or_create_prospect,
@@ -24,13 +28,14 @@ from app.services.prospect_context_loader import (
 from app.services.prospect_agent_loop import run_prospect_agent_loop
 from app.services.twilio_service import send_whatsapp_message, validate_twilio_signature
 
+log = logging.getLogger(__name__)
+
 router = APIRouter(tags=["whatsapp"])
 
 
 def _get_active_renewal_offer(lease_id: str) -> dict | None:
     """Return the latest pending/countered renewal offer for a lease, or None."""
-    from supabase import create_client
-    sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    sb = supabase
     res = (
         sb.table("renewal_offers")
         .select("id, status, proposed_rent")
@@ -45,18 +50,19 @@ def _get_active_renewal_offer(lease_id: str) -> dict | None:
 
 def _parse_form_body(raw: bytes) -> dict[str, str]:
     """Parse application/x-www-form-urlencoded body into a plain dict."""
-    params: dict[str, str] = {}
-    for pair in raw.decode("utf-8").split("&"):
-        if "=" in pair:
-            key, _, value = pair.partition("=")
-            params[unquote_plus(key)] = unquote_plus(value)
-    return params
+    return dict(parse_qsl(raw.decode("utf-8"), keep_blank_values=True))
 
 
 @router.post("/api/webhook/whatsapp")
 async def whatsapp_webhook(request: Request, background_tasks: BackgroundTasks) -> Response:
-    body_bytes = await request.body()
-    body = _parse_form_body(body_bytes)
+    body = _parse_form_body(await request.body())
+
+    # Signature validation in production, before any other work on the payload
+    if os.getenv("ENVIRONMENT", "development") == "production":
+        signature = request.headers.get("x-twilio-signature", "")
+        url = f"{settings.APP_URL}/api/webhook/whatsapp"
+        if signature and not validate_twilio_signature(signature, url, body):
+            return Response(content="Forbidden", status_code=403)
 
     message_sid = body.get("MessageSid", "")
     from_number = body.get("From", "")  # e.g. "whatsapp:+447911123456"
@@ -64,31 +70,23 @@ async def whatsapp_webhook(request: Request, background_tasks: BackgroundTasks)
     num_media = int(body.get("NumMedia", "0"))
 
     # Extract any media URLs Twilio attached (images, documents, etc.)
+    # Only the NumMedia indexed MediaUrl{i} keys, so no other form field can pass as media
     media_urls: list[str] = [
-        body[f"MediaUrl{i}"]
-        for i in range(num_media)
-        if body.get(f"MediaUrl{i}")
+        url for i in range(num_media) if (url := body.get(f"MediaUrl{i}"))
     ]
 
     if not from_number or (not message_body and not media_urls):
         return Response(content="Bad Request", status_code=400)
 
-    # Signature validation in production
-    if os.getenv("ENVIRONMENT", "development") == "production":
-        signature = request.headers.get("x-twilio-signature", "")
-        url = f"{settings.APP_URL}/api/webhook/whatsapp"
-        if signature and not validate_twilio_signature(signature, url, body):
-            return Response(content="Forbidden", status_code=403)
-
     # Strip whatsapp: prefix for DB lookup
     phone_number = from_number.removeprefix("whatsapp:")
 
-    print(f"[webhook] Inbound message from {phone_number!r}: {message_body!r} media={media_urls}")
+    log.debug("Inbound message from %r: %r media=%s", phone_number, message_body, media_urls)
     ctx = await load_tenant_context(phone_number)
-    print(f"[webhook] load_tenant_context result: {'FOUND tenant ' + ctx.tenant.full_name if ctx else 'NOT FOUND — routing to prospect'}")
 
     if ctx is None:
         # Unknown number — route through the prospect agent
+        log.debug("No tenant for %r, routing to prospect agent", phone_number)
         prospect_ctx = await load_or_create_prospect(phone_number)
         await log_prospect_conversation(
             prospect_id=prospect_ctx.prospect_id,
@@ -103,11 +101,8 @@ async def whatsapp_webhook(request: Request, background_tasks: BackgroundTasks)
 
     # Proxy Twilio media to Supabase Storage so URLs are publicly accessible
     if media_urls:
-        import asyncio
         from app.services.media_proxy import proxy_twilio_media_list
-        media_urls = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: proxy_twilio_media_list(media_urls)
-        )
+        media_urls = await asyncio.to_thread(proxy_twilio_media_list, media_urls)
 
     # Attach public media URLs to context so the maintenance tool can store them
     ctx.pending_media_urls = media_urls
@@ -125,7 +120,7 @@ async def whatsapp_webhook(request: Request, background_tasks: BackgroundTasks)
     # If so, route the message to the autonomous renewal agent instead of the
     # general maintenance/query agent.
     if message_body:
-        active_offer = _get_active_renewal_offer(ctx.lease.id)
+        active_offer = await asyncio.to_thread(_get_active_renewal_offer, ctx.lease.id)
         if active_offer:
             background_tasks.add_task(
                 _process_renewal_reply, ctx, active_offer["id"], message_body
@@ -157,41 +152,50 @@ async def _process_and_reply(
         return
 
     reply_message = ""
-    tools_used: list[str] = []
     intent = "general"
+    summary: str | None = None
+    open_threads: dict | None = None
+    error: str | None = None
+    high_severity_actions: list[str] = []
 
     try:
         result = await run_agent_loop(user_message, ctx)
         reply_message = result.final_message
-        tools_used = result.tools_used
         intent = result.intent_classification
+        high_severity_actions = result.high_severity_actions
 
-        if result.high_severity_actions:
-            await _notify_landlord(ctx, result.high_severity_actions)
-
-        await _refresh_conversation_context(ctx, user_message, reply_message, tools_used)
+        summary, open_threads = _build_conversation_context(
+            ctx, user_message, reply_message, result.tools_used
+        )
 
     except Exception as exc:
-        print(f"Agent loop error: {exc}")
+        log.exception("Agent loop error for lease %s", ctx.lease.id)
         reply_message = (
             "I encountered an issue processing your request. "
             "Please try again or contact your property manager directly."
         )
-        await log_agent_action(
-            lease_id=ctx.lease.id,
-            action_category="other",
-            action_description=f"Agent error: {exc}",
-            tools_called=[],
-            confidence_score=0,
-        )
+        error = str(exc)
 
-    await log_conversation(
-        lease_id=ctx.lease.id,
-        direction="outbound",
-        message_body=reply_message,
-        intent_classification=intent,
+    # The reply, the turn record (one RPC) and any landlord alert are independent
+    send_res, record_res, *notify_res = await asyncio.gather(
+        send_whatsapp_message(to, reply_message),
+        record_agent_turn(
+            lease_id=ctx.lease.id,
+            reply_message=reply_message,
+            intent_classification=intent,
+            summary=summary,
+            open_threads=open_threads,
+            error=error,
+        ),
+        *([_notify_landlord(ctx, high_severity_actions)] if high_severity_actions else []),
+        return_exceptions=True,
     )
-    await send_whatsapp_message(to, reply_message)
+    if isinstance(record_res, Exception):
+        log.error("Failed to record agent turn for lease %s: %s", ctx.lease.id, record_res)
+    if notify_res and isinstance(notify_res[0], Exception):
+        log.error("Failed to notify landlord for lease %s: %s", ctx.lease.id, notify_res[0])
+    if isinstance(send_res, Exception):
+        raise send_res
 
 
 async def _process_and_reply_prospect(
@@ -214,25 +218,26 @@ async def _process_and_reply_prospect(
         if result.application_link_sent and result.application_link:
             reply_message = f"{reply_message}\n\nApplication link: {result.application_link}"
 
-        from datetime import date
         prev = prospect_ctx.conversation_summary or ""
         new_entry = (
             f"[{date.today().isoformat()}] "
             f'Prospect: "{user_message[:100]}". '
             f'Agent: "{reply_message[:100]}".'
         )
-        updated = (prev + "\n" + new_entry).strip()[-1000:]
+        updated = append_summary_entry(prev, new_entry)
         await update_prospect(prospect_ctx.prospect_id, {"conversation_summary": updated})
 
-    except Exception as exc:
-        print(f"Prospect agent loop error: {exc}")
+    except Exception:
+        log.exception("Prospect agent loop error for %s", prospect_ctx.prospect_id)
         reply_message = (
             "Thanks for your message! One of our team will be in touch shortly. "
             "You can also reach us by calling the office directly."
         )
 
-    await log_prospect_conversation(prospect_ctx.prospect_id, "outbound", reply_message)
-    await send_whatsapp_message(to, reply_message)
+    await asyncio.gather(
+        log_prospect_conversation(prospect_ctx.prospect_id, "outbound", reply_message),
+        send_whatsapp_message(to, reply_message),
+    )
 
 
 async def _process_renewal_reply(
@@ -245,7 +250,7 @@ async def _process_renewal_reply(
         from app.services.renewal_negotiation_service import analyse_tenant_response
         await analyse_tenant_response(offer_id, message_body)
     except Exception as exc:
-        print(f"[webhook] Renewal negotiation error for offer {offer_id}: {exc}")
+        log.error("Renewal negotiation error for offer %s: %s", offer_id, exc)
         # Fall back to a simple acknowledgement so the tenant isn't left hanging
         try:
             from app.services.twilio_service import send_whatsapp_message
@@ -256,13 +261,7 @@ async def _process_renewal_reply(
 
 
 async def _notify_landlord(ctx: TenantContext, actions: list[str]) -> None:
-    from supabase import create_client
-    sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
-
-    landlord_res = (
-        sb.table("landlords").select("*").eq("id", ctx.landlord_id).maybe_single().execute()
-    )
-    landlord = (landlord_res.data if landlord_res else None)
+    landlord = ctx.landlord
 
     if landlord and landlord.get("whatsapp_number"):
         prefs = landlord.get("notification_preferences") or {}
@@ -273,20 +272,20 @@ async def _notify_landlord(ctx: TenantContext, actions: list[str]) -> None:
             try:
                 await send_whatsapp_message(landlord["whatsapp_number"], summary)
             except Exception as exc:
-                print(f"Failed to notify landlord via WhatsApp: {exc}")
+                log.warning("Failed to notify landlord via WhatsApp: %s", exc)
 
 
-async def _refresh_conversation_context(
+def _build_conversation_context(
     ctx: TenantContext,
     user_message: str,
     agent_reply: str,
     tools_used: list[str],
-) -> None:
-    from datetime import date
-
+) -> tuple[str, dict]:
+    """Return the rolling summary and open threads to store after this turn."""
+    # Passed through unchanged and only serialised by the RPC, so no defensive copy
     current_threads: dict = {}
     if ctx.conversation_context and isinstance(ctx.conversation_context.open_threads, dict):
-        current_threads = dict(ctx.conversation_context.open_threads)
+        current_threads = ctx.conversation_context.open_threads
 
     prev_summary = (
         ctx.conversation_context.summary if ctx.conversation_context and ctx.conversation_context.summary else ""
@@ -296,6 +295,6 @@ async def _refresh_conversation_context(
         f"[{date.today().isoformat()}] Tenant: \"{user_message[:100]}\". "
         f"Agent: \"{agent_reply[:100]}\".{tools_str}"
     )
-    updated_summary = (prev_summary + "\n" + new_entry).strip()[-1000:]
+    updated_summary = append_summary_entry(prev_summary, new_entry)
 
-    await update_conversation_context(ctx.lease.id, updated_summary, current_threads)
+    return updated_summary, current_threads
@@ -26,7 +26,7 @@ class PaymentResponse(BaseModel):
     tenant_name: str | None = None
     unit_identifier: str | None = None
 
-    model_config = {"from_attributes": True}
+    model_config = {"from_attributes": True, "frozen": True}
 
 
 class PaymentRecordResult(BaseModel):
@@ -49,6 +49,8 @@ class LatePatternItem(BaseModel):
     times_late: int
     avg_days_late: float
 
+    model_config = {"frozen": True}
+
 
 class PropertyBreakdownItem(BaseModel):
     unit_identifier: str
@@ -56,6 +58,8 @@ class PropertyBreakdownItem(BaseModel):
     collected: float
     status: str
 
+    model_config = {"frozen": True}
+
 
 class MonthlyReportResponse(BaseModel):
     landlord_id: UUID
@@ -72,3 +76,5 @@ class MonthlyReportResponse(BaseModel):
     property_breakdown: list[PropertyBreakdownItem]
     active_payment_plans: int
     total_arrears_under_plan: float
+
+    model_config = {"frozen": True}
@@ -53,6 +53,8 @@ class ScenarioOut(BaseModel):
     risk_label: str
     is_recommended: bool
 
+    model_config = {"frozen": True}
+
 
 class SimulationOut(BaseModel):
     lease_id: str
@@ -65,6 +67,8 @@ class SimulationOut(BaseModel):
     vacancy_breakeven_months: float | None
     turnover_cost_estimate: float
 
+    model_config = {"frozen": True}
+
 
 class NegotiationAnalysisOut(BaseModel):
     offer_id: str
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-import json
+import functools
+import re
 from dataclasses import dataclass, field
 
 import anthropic
+import orjson
 
 from app.config import settings
 from app.services.context_loader import TenantContext
@@ -12,6 +14,36 @@ from app.services.tool_handlers import AGENT_TOOLS, execute_tool
 
 MAX_ITERATIONS = 8
 
+# Tool calls that decide the intent outright, checked in priority order
+_TOOL_INTENTS: tuple[tuple[str, str], ...] = (
+    ("issue_legal_notice", "legal_response"),
+    ("schedule_maintenance", "maintenance"),
+    ("get_rent_status", "finance"),
+    ("update_escalation_level", "escalation"),
+)
+
+# Keyword buckets for intent classification, checked in priority order
+_INTENT_PATTERNS: tuple[tuple[str, re.Pattern[str]], ...] = (
+    ("finance", re.compile("rent|pay|arrear")),
+    ("maintenance", re.compile("fix|broken|repair|leak|heat")),
+    ("lease_query", re.compile("lease|contract|renew")),
+    ("legal_response", re.compile("notice|evict|legal")),
+)
+
+# Bare thanks that need no model call when the agent asked nothing. Plain
+# acknowledgements ("ok", "got it") are left out: they often confirm an
+# open thread the model should follow up on.
+_THANKS = frozenset({
+    "thanks", "thank you", "thanks a lot", "thank you so much", "thx", "ty", "cheers", "🙏",
+})
+THANKS_REPLY = "You're welcome! Let me know if there's anything else I can help with."
+
+
+@functools.lru_cache(maxsize=1)
+def _claude() -> anthropic.AsyncAnthropic:
+    """One client per process so turns reuse its pooled HTTPS connections."""
+    return anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+
 
 @dataclass
 class AgentResult:
@@ -22,10 +54,34 @@ class AgentResult:
     confidence_score: float = 0.8
 
 
+def _normalize_thanks(message: str) -> str:
+    return message.strip().lower().rstrip("!. ")
+
+
+def should_invoke_llm(user_message: str, ctx: TenantContext) -> bool:
+    """
+    False for a bare "thanks" style message, unless it answers a question
+    from the agent's previous reply.
+    """
+    if _normalize_thanks(user_message) not in _THANKS:
+        return True
+    last = ctx.recent_conversations[-1] if ctx.recent_conversations else None
+    return bool(last and last.direction == "outbound" and "?" in last.message_body)
+
+
 async def run_agent_loop(user_message: str, ctx: TenantContext) -> AgentResult:
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    if not should_invoke_llm(user_message, ctx):
+        return AgentResult(final_message=THANKS_REPLY, confidence_score=0.95)
+
+    client = _claude()
 
-    system_prompt = build_system_prompt(ctx)
+    # Tools + system prompt are the same on every iteration, so mark them as a
+    # cacheable prefix; follow-up calls after tool_use skip re-processing it.
+    system_prompt = [{
+        "type": "text",
+        "text": build_system_prompt(ctx),
+        "cache_control": {"type": "ephemeral"},
+    }]
 
     # Seed conversation history from DB (last 10 messages, chronological)
     messages: list[dict] = [
@@ -45,10 +101,10 @@ async def run_agent_loop(user_message: str, ctx: TenantContext) -> AgentResult:
     while iteration < MAX_ITERATIONS:
         iteration += 1
 
-        response = client.messages.create(
+        response = await client.messages.create(
             model="claude-sonnet-4-5",
             max_tokens=1024,
-            system=system_prompt,
+            system=system_prompt,  # type: ignore[arg-type]
             tools=AGENT_TOOLS,  # type: ignore[arg-type]
             messages=messages,
         )
@@ -77,7 +133,7 @@ async def run_agent_loop(user_message: str, ctx: TenantContext) -> AgentResult:
                 try:
                     result = await execute_tool(tool_name, tool_input, ctx)
                 except Exception as exc:
-                    result_content = json.dumps({"error": str(exc)})
+                    result_content = orjson.dumps({"error": str(exc)}).decode()
                     tool_results.append({
                         "type": "tool_result",
                         "tool_use_id": block.id,
@@ -89,9 +145,10 @@ async def run_agent_loop(user_message: str, ctx: TenantContext) -> AgentResult:
                 if result.is_high_severity and result.landlord_notification_message:
                     high_severity_actions.append(result.landlord_notification_message)
 
-                result_content = json.dumps(
-                    result.data if result.success else {"error": result.error}
-                )
+                result_content = orjson.dumps(
+                    result.data if result.success else {"error": result.error},
+                    option=orjson.OPT_NON_STR_KEYS,
+                ).decode()
                 tool_results.append({
                     "type": "tool_result",
                     "tool_use_id": block.id,
@@ -112,7 +169,7 @@ async def run_agent_loop(user_message: str, ctx: TenantContext) -> AgentResult:
     if not final_message:
         final_message = "I have processed your request. Please let me know if you need anything else."
 
-    intent = _classify_intent(user_message, tools_used)
+    intent = _classify_intent(user_message, set(tools_used))
     confidence = 0.95 if tools_used else 0.8
 
     return AgentResult(
@@ -124,23 +181,13 @@ async def run_agent_loop(user_message: str, ctx: TenantContext) -> AgentResult:
     )
 
 
-def _classify_intent(message: str, tools_used: list[str]) -> str:
-    if "issue_legal_notice" in tools_used:
-        return "legal_response"
-    if "schedule_maintenance" in tools_used:
-        return "maintenance"
-    if "get_rent_status" in tools_used:
-        return "finance"
-    if "update_escalation_level" in tools_used:
-        return "escalation"
+def _classify_intent(message: str, tools_used: set[str]) -> str:
+    for tool_name, intent in _TOOL_INTENTS:
+        if tool_name in tools_used:
+            return intent
 
     lower = message.lower()
-    if any(w in lower for w in ("rent", "pay", "arrear")):
-        return "finance"
-    if any(w in lower for w in ("fix", "broken", "repair", "leak", "heat")):
-        return "maintenance"
-    if any(w in lower for w in ("lease", "contract", "renew")):
-        return "lease_query"
-    if any(w in lower for w in ("notice", "evict", "legal")):
-        return "legal_response"
+    for intent, pattern in _INTENT_PATTERNS:
+        if pattern.search(lower):
+            return intent
     return "general"
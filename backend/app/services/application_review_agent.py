@@ -1,21 +1,47 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime, timezone
+import asyncio
+import functools
+import re
+import threading
+import time
+from datetime import date, datetime, timezone
 from dateutil.relativedelta import relativedelta
 
 import anthropic
-from supabase import create_client
+import orjson
 
 from app.config import settings
+from app.database import supabase
 from app.services.twilio_service import send_whatsapp_message
 
 
 def _sb():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
-REVIEW_AGENT_TOOLS = [
+# Tool result for make_decision; it never varies, so encode it once
+_DECISION_ACK = orjson.dumps({"acknowledged": True}).decode()
+
+# The tool schema forces a decision, so a second turn is only ever a nudge
+MAX_REVIEW_TURNS = 2
+
+# Bursts of submissions queue here instead of all hitting Anthropic at once
+# (and tripping its rate limit); the Supabase reads/writes stay outside it.
+_review_semaphore = asyncio.Semaphore(settings.REVIEW_CONCURRENCY)
+
+
+@functools.lru_cache(maxsize=1)
+def _claude() -> anthropic.AsyncAnthropic:
+    """
+    One client per process so reviews reuse its pooled HTTPS connections.
+    Rate-limit/5xx/connection errors are retried by the SDK with exponential
+    backoff and jitter (honouring retry-after).
+    """
+    return anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, max_retries=3)
+
+
+REVIEW_AGENT_TOOLS = (
     {
         "name": "make_decision",
         "description": (
@@ -40,8 +66,33 @@ REVIEW_AGENT_TOOLS = [
             },
             "required": ["decision", "reason"],
         },
-    }
-]
+    },
+)
+
+
+# Criteria and instructions are the same for every review; only the figures
+# quoted in the income rule are filled in per application.
+_REVIEW_PROMPT_CRITERIA = """\
+## Decision Criteria
+Evaluate the application against these criteria in order of importance:
+
+1. **Income:** Monthly income should be at least 2.5× the monthly rent.
+   - Monthly rent: {rent_display}
+   - Minimum required income: £{min_income}
+   - Applicant income: {income_display}
+
+2. **Employment Stability:** The applicant should have stable income — employed, self-employed, retired with pension, or documented benefits. Students and unemployed applicants require additional supporting info.
+
+3. **References:** References should be present and should not mention prior evictions, rent arrears, or antisocial behaviour.
+
+4. **Application Completeness:** Name, email, employment status, and income must be provided. Incomplete applications should be rejected.
+
+5. **General Suitability:** Use good judgment. If the application is borderline, lean towards approving and give the benefit of the doubt.
+
+## Instructions
+- Call `make_decision` exactly once.
+- Your `reason` should be friendly and concise — it will be sent directly to the applicant via WhatsApp.
+- Do not reveal internal scoring details in the reason."""
 
 
 def _build_review_system_prompt(
@@ -89,42 +140,34 @@ You MUST call the `make_decision` tool with your decision and reason. Do not out
 ## Additional Information
 {application.get("additional_info") or "None."}
 
-## Decision Criteria
-Evaluate the application against these criteria in order of importance:
+{_REVIEW_PROMPT_CRITERIA.format(rent_display=rent_display, min_income=min_income, income_display=income_display)}"""
 
-1. **Income:** Monthly income should be at least 2.5× the monthly rent.
-   - Monthly rent: {rent_display}
-   - Minimum required income: £{min_income}
-   - Applicant income: {income_display}
-
-2. **Employment Stability:** The applicant should have stable income — employed, self-employed, retired with pension, or documented benefits. Students and unemployed applicants require additional supporting info.
 
-3. **References:** References should be present and should not mention prior evictions, rent arrears, or antisocial behaviour.
+# The lease template rarely changes, so keep the raw (unsubstituted) body per
+# unit for a few minutes instead of re-running up to three lookups per approval.
+_LEASE_TEMPLATE_TTL = 300.0
+_lease_template_cache: dict[str | None, tuple[float, str]] = {}
+_lease_template_lock = threading.Lock()
 
-4. **Application Completeness:** Name, email, employment status, and income must be provided. Incomplete applications should be rejected.
+# Every placeholder the templates use, substituted in a single pass
+_PLACEHOLDER_RE = re.compile("|".join(map(re.escape, (
+    "{{tenant_name}}", "{{unit_address}}", "{{monthly_rent}}", "{{start_date}}",
+    "[TENANT NAME]", "[PROPERTY ADDRESS]", "[MONTHLY RENT]", "[START DATE]",
+))))
 
-5. **General Suitability:** Use good judgment. If the application is borderline, lean towards approving and give the benefit of the doubt.
 
-## Instructions
-- Call `make_decision` exactly once.
-- Your `reason` should be friendly and concise — it will be sent directly to the applicant via WhatsApp.
-- Do not reveal internal scoring details in the reason."""
+def _get_cached_lease_template(unit_id: str | None) -> str | None:
+    with _lease_template_lock:
+        cached = _lease_template_cache.get(unit_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return None
 
 
-def _load_lease_template(
-    sb,
-    unit_id: str | None,
-    applicant_name: str,
-    unit_address: str,
-    monthly_rent: float | None,
-) -> str:
-    """Load a lease template and substitute applicant/unit placeholders."""
-    # Determine lease start date: first of the month after today
-    today = datetime.now(timezone.utc).date()
-    start_date = (today.replace(day=1) + relativedelta(months=1)).isoformat()
-    rent_str = f"£{monthly_rent:,.2f}" if monthly_rent else "as agreed"
-
+def _fetch_lease_template(sb, unit_id: str | None) -> str:
+    """Resolve the raw lease template for a unit, falling back to the built-in one."""
     template_content = None
+    lookup_failed = False
 
     # 1. Try document_templates table
     try:
@@ -139,6 +182,7 @@ def _load_lease_template(
         if dt_res and dt_res.data and dt_res.data.get("content"):
             template_content = dt_res.data["content"]
     except Exception as exc:
+        lookup_failed = True
         print(f"Review agent: could not query document_templates: {exc}")
 
     # 2. Try leases.special_terms for the same unit
@@ -156,6 +200,7 @@ def _load_lease_template(
             if lease_res and lease_res.data and lease_res.data.get("special_terms"):
                 template_content = lease_res.data["special_terms"]
         except Exception as exc:
+            lookup_failed = True
             print(f"Review agent: could not query leases.special_terms: {exc}")
 
     # 3. Try any lease with special_terms as a final DB fallback
@@ -173,12 +218,41 @@ def _load_lease_template(
             if any_lease_res and any_lease_res.data and any_lease_res.data.get("special_terms"):
                 template_content = any_lease_res.data["special_terms"]
         except Exception as exc:
+            lookup_failed = True
             print(f"Review agent: could not query any lease special_terms: {exc}")
 
     # 4. Minimal hard-coded fallback
     if not template_content:
         template_content = _DEFAULT_LEASE_TEMPLATE
 
+    # Don't pin a fallback chosen only because a lookup errored
+    if not lookup_failed:
+        with _lease_template_lock:
+            _lease_template_cache[unit_id] = (time.monotonic() + _LEASE_TEMPLATE_TTL, template_content)
+    return template_content
+
+
+@functools.lru_cache(maxsize=2)
+def _next_month_first(today: date) -> str:
+    """Lease start date: first of the month after today (cached per day)."""
+    return (today.replace(day=1) + relativedelta(months=1)).isoformat()
+
+
+def _load_lease_template(
+    sb,
+    unit_id: str | None,
+    applicant_name: str,
+    unit_address: str,
+    monthly_rent: float | None,
+) -> str:
+    """Load a lease template and substitute applicant/unit placeholders."""
+    start_date = _next_month_first(datetime.now(timezone.utc).date())
+    rent_str = f"£{monthly_rent:,.2f}" if monthly_rent else "as agreed"
+
+    template_content = _get_cached_lease_template(unit_id)
+    if template_content is None:
+        template_content = _fetch_lease_template(sb, unit_id)
+
     # Substitute placeholders
     replacements = {
         "{{tenant_name}}": applicant_name,
@@ -190,10 +264,7 @@ def _load_lease_template(
         "[MONTHLY RENT]": rent_str,
         "[START DATE]": start_date,
     }
-    for placeholder, value in replacements.items():
-        template_content = template_content.replace(placeholder, value)
-
-    return template_content
+    return _PLACEHOLDER_RE.sub(lambda m: replacements[m.group(0)], template_content)
 
 
 def _upload_lease_preview_pdf(
@@ -236,43 +307,63 @@ async def _execute_approve(
 
     lease_content = _load_lease_template(sb, unit_id, applicant_name, unit_address, monthly_rent)
 
-    sb.table("lease_applications").update({
-        "status": "approved",
-        "landlord_notes": f"[AI reviewed] {reason}",
-        "updated_at": datetime.now(timezone.utc).isoformat(),
-    }).eq("id", application_id).execute()
-
+    now_iso = datetime.now(timezone.utc).isoformat()
     prospect_id = application.get("prospect_id", "")
-    sb.table("prospects").update({
-        "status": "approved",
-        "updated_at": datetime.now(timezone.utc).isoformat(),
-    }).eq("id", prospect_id).execute()
-
-    token_res = sb.table("signing_tokens").insert({
-        "prospect_id": prospect_id,
-        "application_id": application_id,
-        "lease_content": lease_content,
-        "prospect_name": applicant_name,
-        "prospect_phone": prospect.get("phone_number", ""),
-        "unit_address": unit_address,
-        "monthly_rent": monthly_rent,
-    }).execute()
+
+    # The application update and the token insert don't depend on each other
+    _, token_res = await asyncio.gather(
+        asyncio.to_thread(
+            sb.table("lease_applications").update({
+                "status": "approved",
+                "landlord_notes": f"[AI reviewed] {reason}",
+                "updated_at": now_iso,
+            }).eq("id", application_id).execute
+        ),
+        asyncio.to_thread(
+            sb.table("signing_tokens").insert({
+                "prospect_id": prospect_id,
+                "application_id": application_id,
+                "lease_content": lease_content,
+                "prospect_name": applicant_name,
+                "prospect_phone": prospect.get("phone_number", ""),
+                "unit_address": unit_address,
+                "monthly_rent": monthly_rent,
+            }).execute
+        ),
+    )
 
     if not token_res.data:
         print(f"Review agent: failed to create signing token for application {application_id}")
+        await asyncio.to_thread(
+            sb.table("prospects").update({"status": "approved", "updated_at": now_iso})
+            .eq("id", prospect_id).execute
+        )
         return
 
     token_id = token_res.data[0]["id"]
     app_url = settings.FRONTEND_URL or "http://localhost:3000"
     signing_link = f"{app_url}/sign/{token_id}"
 
-    sb.table("prospects").update({
-        "status": "lease_sent",
-        "updated_at": datetime.now(timezone.utc).isoformat(),
-    }).eq("id", prospect_id).execute()
-
     prospect_phone = prospect.get("phone_number", "")
-    if prospect_phone:
+
+    # Render + upload the unsigned lease PDF (sent as an attachment) while the
+    # status write is in flight, so the send waits on the slower of the two
+    pdf_task = (
+        asyncio.create_task(asyncio.to_thread(
+            _upload_lease_preview_pdf, sb, token_id, applicant_name, unit_address, monthly_rent, lease_content
+        ))
+        if prospect_phone else None
+    )
+
+    # One write straight to lease_sent instead of approved → lease_sent
+    await asyncio.to_thread(
+        sb.table("prospects").update({
+            "status": "lease_sent",
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }).eq("id", prospect_id).execute
+    )
+
+    if pdf_task:
         wa_number = f"whatsapp:{prospect_phone}" if not prospect_phone.startswith("whatsapp:") else prospect_phone
         approval_text = (
             f"Hi {applicant_name}, great news — your rental application has been approved!\n\n"
@@ -280,8 +371,7 @@ async def _execute_approve(
             f"Your tenancy agreement is attached as a PDF for you to read. "
             f"When you're ready, sign it here (link expires in 7 days):\n{signing_link}"
         )
-        # Try to generate and upload an unsigned lease PDF to send as attachment
-        pdf_url = _upload_lease_preview_pdf(sb, token_id, applicant_name, unit_address, monthly_rent, lease_content)
+        pdf_url = await pdf_task
         try:
             if pdf_url:
                 from app.services.twilio_service import send_whatsapp_media
@@ -301,17 +391,23 @@ async def _execute_reject(
     prospect: dict,
     reason: str,
 ) -> None:
-    sb.table("lease_applications").update({
-        "status": "rejected",
-        "landlord_notes": f"[AI reviewed] {reason}",
-        "updated_at": datetime.now(timezone.utc).isoformat(),
-    }).eq("id", application_id).execute()
-
+    now_iso = datetime.now(timezone.utc).isoformat()
     prospect_id = application.get("prospect_id", "")
-    sb.table("prospects").update({
-        "status": "rejected",
-        "updated_at": datetime.now(timezone.utc).isoformat(),
-    }).eq("id", prospect_id).execute()
+    await asyncio.gather(
+        asyncio.to_thread(
+            sb.table("lease_applications").update({
+                "status": "rejected",
+                "landlord_notes": f"[AI reviewed] {reason}",
+                "updated_at": now_iso,
+            }).eq("id", application_id).execute
+        ),
+        asyncio.to_thread(
+            sb.table("prospects").update({
+                "status": "rejected",
+                "updated_at": now_iso,
+            }).eq("id", prospect_id).execute
+        ),
+    )
 
     prospect_phone = prospect.get("phone_number", "")
     applicant_name = application.get("full_name") or prospect.get("name") or "there"
@@ -332,13 +428,29 @@ async def _execute_reject(
     print(f"Review agent: rejected application {application_id}")
 
 
+# Only structurally unusable applications are rejected without a model call;
+# affordability and employment judgements are always left to the reviewer.
+_REQUIRED_FIELDS = (
+    ("full_name", "your full name"),
+    ("email", "your email address"),
+)
+
+
+def _hard_reject_reason(application: dict) -> str | None:
+    """Reason to reject outright (no name or email to act on), else None."""
+    missing = [label for field, label in _REQUIRED_FIELDS if not application.get(field)]
+    if missing:
+        return f"The application is incomplete — it is missing {', '.join(missing)}."
+    return None
+
+
 async def run_application_review(application_id: str) -> None:
     """AI agent that reviews a submitted rental application and approves or rejects it."""
     sb = _sb()
 
     app_res = (
         sb.table("lease_applications")
-        .select("*, prospects(*), units(*)")
+        .select("*, prospects(*), units(*, leases(monthly_rent, created_at))")
         .eq("id", application_id)
         .maybe_single()
         .execute()
@@ -351,23 +463,20 @@ async def run_application_review(application_id: str) -> None:
     prospect = application.get("prospects") or {}
     unit = application.get("units") or {}
 
-    monthly_rent: float | None = None
-    unit_id = application.get("unit_id")
-    if unit_id:
-        rent_res = (
-            sb.table("leases")
-            .select("monthly_rent")
-            .eq("unit_id", unit_id)
-            .order("created_at", desc=True)
-            .limit(1)
-            .maybe_single()
-            .execute()
-        )
-        if rent_res and rent_res.data and rent_res.data.get("monthly_rent"):
-            monthly_rent = float(rent_res.data["monthly_rent"])
+    # Rent comes from the unit's most recent lease, embedded in the same request
+    latest_lease = max(unit.pop("leases", None) or [], key=lambda lease: lease.get("created_at") or "", default={})
+    monthly_rent: float | None = (
+        float(latest_lease["monthly_rent"]) if latest_lease.get("monthly_rent") else None
+    )
+
+    # Structurally invalid applications don't need the model
+    gate_reason = _hard_reject_reason(application)
+    if gate_reason:
+        await _execute_reject(sb, application_id, application, prospect, gate_reason)
+        return
 
     system_prompt = _build_review_system_prompt(application, prospect, unit, monthly_rent)
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    client = _claude()
 
     messages: list[dict] = [
         {"role": "user", "content": "Please review this rental application and make a decision."}
@@ -376,35 +485,50 @@ async def run_application_review(application_id: str) -> None:
     decision: str | None = None
     reason: str = ""
 
-    for _ in range(4):
-        response = client.messages.create(
-            model="claude-sonnet-4-5",
-            max_tokens=1024,
-            system=system_prompt,
-            tools=REVIEW_AGENT_TOOLS,  # type: ignore[arg-type]
-            messages=messages,
-        )
-
-        messages.append({"role": "assistant", "content": response.content})
-
-        if response.stop_reason == "tool_use":
-            tool_results = []
-            for block in response.content:
-                if block.type != "tool_use":
-                    continue
-                if block.name == "make_decision":
-                    decision = block.input.get("decision")
-                    reason = block.input.get("reason", "")
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": json.dumps({"acknowledged": True}),
-                    })
-            messages.append({"role": "user", "content": tool_results})
-            if decision:
+    async with _review_semaphore:
+        for _ in range(MAX_REVIEW_TURNS):
+            # Stream so the decision is acted on as soon as its tool call is
+            # complete, without waiting for anything the model writes after it.
+            # Leaving the block early closes the stream.
+            async with client.messages.stream(
+                model="claude-sonnet-4-5",
+                max_tokens=1024,
+                system=system_prompt,
+                tools=REVIEW_AGENT_TOOLS,  # type: ignore[arg-type]
+                messages=messages,
+            ) as stream:
+                async for event in stream:
+                    if (
+                        event.type == "content_block_stop"
+                        and event.content_block.type == "tool_use"
+                        and event.content_block.name == "make_decision"
+                    ):
+                        decision = event.content_block.input.get("decision")
+                        reason = event.content_block.input.get("reason", "")
+                        if decision:
+                            break
+                if decision:
+                    break
+                response = await stream.get_final_message()
+
+            messages.append({"role": "assistant", "content": response.content})
+
+            if response.stop_reason == "tool_use":
+                tool_results = []
+                for block in response.content:
+                    if block.type != "tool_use":
+                        continue
+                    if block.name == "make_decision":
+                        tool_results.append({
+                            "type": "tool_result",
+                            "tool_use_id": block.id,
+                            "content": _DECISION_ACK,
+                        })
+                messages.append({"role": "user", "content": tool_results})
+                # The next turn only needs the original request and this exchange
+                del messages[1:-2]
+            elif response.stop_reason == "end_turn":
                 break
-        elif response.stop_reason == "end_turn":
-            break
 
     if not decision:
         print(f"Review agent: no decision reached for application {application_id}")
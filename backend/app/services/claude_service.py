@@ -1,22 +1,78 @@
 """
 Claude API Integration Service for Maintenance Analysis
 """
-import json
+import functools
+import hashlib
+import re
+from collections import OrderedDict
 from typing import Dict, Any, Optional
-from anthropic import Anthropic, APIError
-import asyncio
+from anthropic import AsyncAnthropic, APIError
 from app.config import settings
 
+ANALYSIS_CACHE_SIZE = 1024
+
+# Classification into a fixed 6-field JSON doesn't need the larger model
+ANALYSIS_MODEL = settings.ANALYSIS_MODEL
+# The forced record_analysis input is ~100-200 tokens including a couple of
+# sentences of reasoning; leave headroom so it isn't cut off mid-call
+ANALYSIS_MAX_TOKENS = 512
+
+MAINTENANCE_CATEGORIES = ['plumbing', 'electrical', 'hvac', 'appliance', 'structural', 'pest', 'cosmetic', 'other']
+MAINTENANCE_URGENCIES = ['low', 'medium', 'high', 'emergency']
+COST_RANGES = ['low', 'medium', 'high']
+
+# Forcing this tool makes the API return the analysis as structured input
+# rather than free text that has to be parsed (and re-requested when it isn't JSON)
+MAINTENANCE_ANALYSIS_TOOL = {
+    "name": "record_analysis",
+    "description": "Record the analysis of a tenant maintenance request.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "category": {"type": "string", "enum": MAINTENANCE_CATEGORIES},
+            "urgency": {"type": "string", "enum": MAINTENANCE_URGENCIES},
+            "estimated_cost_range": {"type": "string", "enum": COST_RANGES},
+            "vendor_required": {"type": "boolean"},
+            "reasoning": {"type": "string", "description": "Clear operational explanation."},
+            "confidence_score": {"type": "number", "minimum": 0, "maximum": 1},
+        },
+        "required": [
+            "category", "urgency", "estimated_cost_range",
+            "vendor_required", "reasoning", "confidence_score",
+        ],
+    },
+}
+
+# Keyword fallback, used when the API is unavailable: categories are checked in
+# order, then any emergency keyword overrides the urgency. Plain substring
+# matches, as with the word lists these replace.
+_FALLBACK_PLUMBING_RE = re.compile("leak|water|pipe|drain|toilet|sink")
+_FALLBACK_PLUMBING_HIGH_RE = re.compile("flood|major")
+_FALLBACK_ELECTRICAL_RE = re.compile("electric|power|outlet|light|switch")
+_FALLBACK_HVAC_RE = re.compile("heat|cooling|ac|furnace|temperature")
+_FALLBACK_HVAC_HIGH_RE = re.compile("no heat|no cooling|freezing")
+_FALLBACK_APPLIANCE_RE = re.compile("appliance|fridge|stove|washer|dryer")
+_FALLBACK_EMERGENCY_RE = re.compile("emergency|urgent|flood|fire|gas|dangerous")
+
+@functools.lru_cache(maxsize=4)
+def _anthropic_client(api_key: str) -> AsyncAnthropic:
+    """Shared per key, so every ClaudeService reuses one pool of HTTPS connections."""
+    return AsyncAnthropic(api_key=api_key, max_retries=3, timeout=60.0)
+
 class ClaudeService:
     """Service for integrating with Claude API for maintenance request analysis."""
     
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize Claude service with API key."""
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+        """Initialize Claude service with API key and (optionally) the analysis model."""
         self.api_key = api_key or settings.ANTHROPIC_API_KEY
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
         
-        self.client = Anthropic(api_key=self.api_key)
+        self.client = _anthropic_client(self.api_key)
+        self.model = model or ANALYSIS_MODEL
+
+        # Validated analyses keyed by normalized description + unit, LRU-evicted
+        self._analysis_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
         
         # System prompt exactly as specified
         self.system_prompt = """You are an expert property maintenance operations manager.
@@ -37,10 +93,7 @@ Rules:
 - If tenant can reasonably fix issue safely themselves, vendor_required = false.
 - Always prioritize safety.
 
-Return ONLY valid JSON.
-No commentary.
-No markdown.
-No explanation outside JSON."""
+Report your analysis by calling the record_analysis tool."""
 
     async def analyze_maintenance_request(
         self, 
@@ -59,6 +112,12 @@ No explanation outside JSON."""
         Returns:
             Dict containing AI analysis with all required fields
         """
+        cache_key = self._analysis_cache_key(description, unit_address)
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            self._analysis_cache.move_to_end(cache_key)
+            return dict(cached)
+
         # Build the user prompt with context
         user_prompt = f"Analyze this maintenance request:\n\n{description}"
         
@@ -69,12 +128,13 @@ No explanation outside JSON."""
         
         try:
             # Call Claude API with temperature 0.2 for consistency
-            response = await asyncio.to_thread(
-                self.client.messages.create,
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=500,
+            response = await self.client.messages.create(
+                model=self.model,
+                max_tokens=ANALYSIS_MAX_TOKENS,
                 temperature=0.2,
                 system=self.system_prompt,
+                tools=[MAINTENANCE_ANALYSIS_TOOL],
+                tool_choice={"type": "tool", "name": MAINTENANCE_ANALYSIS_TOOL["name"]},
                 messages=[
                     {
                         "role": "user",
@@ -83,35 +143,29 @@ No explanation outside JSON."""
                 ]
             )
             
-            # Extract the response text
-            response_text = response.content[0].text.strip()
-            
-            # Parse JSON response
-            try:
-                analysis = json.loads(response_text)
-            except json.JSONDecodeError as e:
-                # Retry once if invalid JSON
-                return await self._retry_analysis(description, unit_address, tenant_name)
+            if response.stop_reason == "max_tokens":
+                # A truncated tool call can still parse into a partial input
+                print("Claude analysis hit max_tokens; using fallback analysis")
+                return self._fallback_analysis(description)
+
+            analysis = next(
+                (dict(block.input) for block in response.content if block.type == "tool_use"),
+                None,
+            )
             
             # Validate required fields
-            required_fields = [
-                'category', 'urgency', 'estimated_cost_range', 
-                'vendor_required', 'reasoning', 'confidence_score'
-            ]
-            
-            for field in required_fields:
-                if field not in analysis:
-                    # Retry if missing fields
-                    return await self._retry_analysis(description, unit_address, tenant_name)
+            required_fields = MAINTENANCE_ANALYSIS_TOOL["input_schema"]["required"]
+            if analysis is None or any(field not in analysis for field in required_fields):
+                return self._fallback_analysis(description)
             
             # Validate field values
-            if analysis['category'] not in ['plumbing', 'electrical', 'hvac', 'appliance', 'structural', 'pest', 'cosmetic', 'other']:
+            if analysis['category'] not in MAINTENANCE_CATEGORIES:
                 analysis['category'] = 'other'
             
-            if analysis['urgency'] not in ['low', 'medium', 'high', 'emergency']:
+            if analysis['urgency'] not in MAINTENANCE_URGENCIES:
                 analysis['urgency'] = 'medium'
                 
-            if analysis['estimated_cost_range'] not in ['low', 'medium', 'high']:
+            if analysis['estimated_cost_range'] not in COST_RANGES:
                 analysis['estimated_cost_range'] = 'medium'
             
             if not isinstance(analysis['vendor_required'], bool):
@@ -123,6 +177,9 @@ No explanation outside JSON."""
                 # Ensure confidence score is between 0 and 1
                 analysis['confidence_score'] = max(0.0, min(1.0, float(analysis['confidence_score'])))
             
+            self._analysis_cache[cache_key] = dict(analysis)
+            if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
             return analysis
             
         except APIError as e:
@@ -134,65 +191,12 @@ No explanation outside JSON."""
             print(f"Unexpected error in Claude analysis: {str(e)}")
             return self._fallback_analysis(description)
     
-    async def _retry_analysis(
-        self, 
-        description: str,
-        unit_address: Optional[str] = None,
-        tenant_name: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """Retry analysis once if invalid response."""
-        try:
-            # Add clarification to prompt
-            clarified_prompt = f"""Analyze this maintenance request and return ONLY a JSON object with these exact fields:
-- category
-- urgency  
-- estimated_cost_range
-- vendor_required
-- reasoning
-- confidence_score
-
-Request: {description}"""
-            
-            if unit_address:
-                clarified_prompt += f"\nUnit: {unit_address}"
-            
-            response = await asyncio.to_thread(
-                self.client.messages.create,
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=500,
-                temperature=0.2,
-                system=self.system_prompt,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": clarified_prompt
-                    }
-                ]
-            )
-            
-            response_text = response.content[0].text.strip()
-            
-            # Try to extract JSON if wrapped in markdown
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
-            
-            analysis = json.loads(response_text)
-            
-            # Ensure all required fields
-            return {
-                'category': analysis.get('category', 'other'),
-                'urgency': analysis.get('urgency', 'medium'),
-                'estimated_cost_range': analysis.get('estimated_cost_range', 'medium'),
-                'vendor_required': bool(analysis.get('vendor_required', True)),
-                'reasoning': analysis.get('reasoning', 'Unable to analyze request'),
-                'confidence_score': float(analysis.get('confidence_score', 0.5))
-            }
-            
-        except Exception:
-            return self._fallback_analysis(description)
+    @staticmethod
+    def _analysis_cache_key(description: str, unit_address: Optional[str]) -> str:
+        """Case/whitespace-insensitive key, so repeats of the same report share one entry."""
+        normalized = " ".join(description.lower().split())
+        key = f"{normalized}\0{unit_address or ''}"
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
     
     def _fallback_analysis(self, description: str) -> Dict[str, Any]:
         """Provide fallback analysis when Claude API fails."""
@@ -200,26 +204,29 @@ Request: {description}"""
         desc_lower = description.lower()
         
         category = 'other'
-        urgency = 'medium'
         vendor_required = True
         
+        # Emergency keywords decide urgency outright, so check them first and
+        # skip the per-category urgency scans when they hit
+        emergency = _FALLBACK_EMERGENCY_RE.search(desc_lower) is not None
+        urgency = 'emergency' if emergency else 'medium'
+        
         # Category detection
-        if any(word in desc_lower for word in ['leak', 'water', 'pipe', 'drain', 'toilet', 'sink']):
+        if _FALLBACK_PLUMBING_RE.search(desc_lower):
             category = 'plumbing'
-            urgency = 'high' if 'flood' in desc_lower or 'major' in desc_lower else 'medium'
-        elif any(word in desc_lower for word in ['electric', 'power', 'outlet', 'light', 'switch']):
+            if not emergency and _FALLBACK_PLUMBING_HIGH_RE.search(desc_lower):
+                urgency = 'high'
+        elif _FALLBACK_ELECTRICAL_RE.search(desc_lower):
             category = 'electrical'
-            urgency = 'high'
-        elif any(word in desc_lower for word in ['heat', 'cooling', 'ac', 'furnace', 'temperature']):
+            if not emergency:
+                urgency = 'high'
+        elif _FALLBACK_HVAC_RE.search(desc_lower):
             category = 'hvac'
-            urgency = 'high' if any(word in desc_lower for word in ['no heat', 'no cooling', 'freezing']) else 'medium'
-        elif any(word in desc_lower for word in ['appliance', 'fridge', 'stove', 'washer', 'dryer']):
+            if not emergency and _FALLBACK_HVAC_HIGH_RE.search(desc_lower):
+                urgency = 'high'
+        elif _FALLBACK_APPLIANCE_RE.search(desc_lower):
             category = 'appliance'
         
-        # Emergency detection
-        if any(word in desc_lower for word in ['emergency', 'urgent', 'flood', 'fire', 'gas', 'dangerous']):
-            urgency = 'emergency'
-        
         return {
             'category': category,
             'urgency': urgency,
@@ -268,8 +275,7 @@ Write a brief, professional message requesting their service. Include:
 Keep it under 100 words."""
 
         try:
-            response = await asyncio.to_thread(
-                self.client.messages.create,
+            response = await self.client.messages.create(
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=200,
                 temperature=0.3,
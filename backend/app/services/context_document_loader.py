@@ -1,8 +1,38 @@
 from __future__ import annotations
 
+import contextlib
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    from docx import Document
+except ImportError:
+    Document = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+try:
+    import pymupdf  # optional, opt-in via PDF_BACKEND=pymupdf (AGPL-licensed)
+except ImportError:
+    pymupdf = None
+
 LEASE_CONTEXT_DIR = Path(__file__).parent.parent / "lease_context"
+CACHE_DIR = LEASE_CONTEXT_DIR / ".cache"
+
+_ALLOWED_SUFFIXES = frozenset({".txt", ".md", ".pdf", ".docx"})
 
 _cached_context: str | None = None
 
@@ -10,7 +40,9 @@ _cached_context: str | None = None
 def load_lease_context_documents() -> str:
     """
     Reads all .txt, .md, .pdf, and .docx files from the lease_context folder and
-    returns their combined text. Result is cached after the first call.
+    returns their combined text. Result is cached after the first call, and on
+    disk under lease_context/.cache keyed by the files' names, mtimes and sizes,
+    so a cold start only re-parses when the documents change.
     """
     global _cached_context
     if _cached_context is not None:
@@ -20,49 +52,124 @@ def load_lease_context_documents() -> str:
         _cached_context = ""
         return _cached_context
 
-    parts: list[str] = []
-
-    for path in sorted(LEASE_CONTEXT_DIR.iterdir()):
-        if path.name == "README.md" or path.suffix.lower() not in (".txt", ".md", ".pdf", ".docx"):
-            continue
+    # (path, lowercased suffix, (name, mtime_ns, size)) per document, from one
+    # scandir pass and one stat per file
+    docs: list[tuple[Path, str, tuple[str, int, int]]] = []
+    with os.scandir(LEASE_CONTEXT_DIR) as entries:
+        for entry in entries:
+            suffix = os.path.splitext(entry.name)[1].lower()
+            if entry.name == "README.md" or suffix not in _ALLOWED_SUFFIXES or not entry.is_file():
+                continue
+            st = entry.stat()
+            docs.append((Path(entry.path), suffix, (entry.name, st.st_mtime_ns, st.st_size)))
+    docs.sort(key=lambda d: d[2][0])
+
+    cache_file = CACHE_DIR / f"{_cache_key([d[2] for d in docs])}.txt"
+    try:
+        _cached_context = cache_file.read_text(encoding="utf-8")
+        return _cached_context
+    except OSError:
+        pass
 
+    with _parse_lock():
+        # Another worker may have parsed the documents while we waited
         try:
-            if path.suffix.lower() == ".pdf":
-                text = _read_pdf(path)
-            elif path.suffix.lower() == ".docx":
-                text = _read_docx(path)
-            else:
-                text = path.read_text(encoding="utf-8", errors="replace")
-
-            if text.strip():
-                parts.append(f"--- {path.name} ---\n{text.strip()}")
-        except Exception as exc:
-            print(f"[context_document_loader] Could not read {path.name}: {exc}")
-
-    _cached_context = "\n\n".join(parts)
+            _cached_context = cache_file.read_text(encoding="utf-8")
+            return _cached_context
+        except OSError:
+            pass
+        _cached_context = _parse_documents(docs)
+        _write_cache(cache_file, _cached_context)
     return _cached_context
 
 
-def _read_docx(path: Path) -> str:
+@contextlib.contextmanager
+def _parse_lock():
+    """
+    Exclusive lock on lease_context/.cache/.lock, so when several worker
+    processes start cold together only one parses the documents and the rest
+    read the cache file it writes.
+    """
+    if fcntl is None:
+        yield
+        return
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        lock_file = open(CACHE_DIR / ".lock", "a")
+    except OSError:
+        yield
+        return
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _parse_documents(docs: list[tuple[Path, str, tuple[str, int, int]]]) -> str:
+    with ThreadPoolExecutor(max_workers=min(4, len(docs) or 1)) as pool:
+        texts = list(pool.map(_read_document, [d[0] for d in docs], [d[1] for d in docs]))
+
+    return "\n\n".join(
+        f"--- {path.name} ---\n{text.strip()}" for (path, _, _), text in zip(docs, texts) if text.strip()
+    )
+
+
+def _cache_key(stats: list[tuple[str, int, int]]) -> str:
+    return hashlib.sha1(repr((settings.PDF_BACKEND, stats)).encode("utf-8")).hexdigest()
+
+
+def _write_cache(cache_file: Path, text: str) -> None:
+    """Write via a temp file + os.replace so a concurrent reader never sees a partial file."""
     try:
-        from docx import Document
-        doc = Document(str(path))
-        paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-        return "\n\n".join(paragraphs)
-    except ImportError:
+        CACHE_DIR.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, cache_file)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        for stale in CACHE_DIR.glob("*.txt"):
+            if stale != cache_file:
+                stale.unlink(missing_ok=True)
+    except OSError as exc:
+        print(f"[context_document_loader] Could not write cache {cache_file.name}: {exc}")
+
+
+def _read_document(path: Path, suffix: str) -> str:
+    try:
+        if suffix == ".pdf":
+            return _read_pdf(path)
+        if suffix == ".docx":
+            return _read_docx(path)
+        return path.read_text(encoding="utf-8", errors="replace")
+    except Exception as exc:
+        print(f"[context_document_loader] Could not read {path.name}: {exc}")
+        return ""
+
+
+def _read_docx(path: Path) -> str:
+    if Document is None:
         print("[context_document_loader] python-docx not installed — skipping .docx file.")
         return ""
+    doc = Document(str(path))
+    paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
+    return "\n\n".join(paragraphs)
 
 
 def _read_pdf(path: Path) -> str:
-    try:
-        from pypdf import PdfReader
-        reader = PdfReader(str(path))
-        pages = [page.extract_text() or "" for page in reader.pages]
-        return "\n".join(pages)
-    except ImportError:
+    if pymupdf is not None and settings.PDF_BACKEND == "pymupdf":
+        with pymupdf.open(str(path)) as doc:
+            return "\n".join(page.get_text("text") for page in doc)
+    if PdfReader is None:
         print("[context_document_loader] pypdf not installed — skipping PDF file.")
         return ""
+    reader = PdfReader(str(path))
+    pages = [page.extract_text() or "" for page in reader.pages]
+    return "\n".join(pages)
 
 
 def invalidate_cache() -> None:
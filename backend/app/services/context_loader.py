@@ -1,31 +1,34 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from dataclasses import dataclass, field
-from typing import Any
+from datetime import datetime, timezone
+from typing import Any, Callable
 
-from supabase import create_client, Client
+import orjson
+from supabase import Client
 
-from app.config import settings
+from app.database import supabase
 
 
 def _get_supabase() -> Client:
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 # ---------------------------------------------------------------------------
 # Data classes mirroring the DB row shapes needed by the agent
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Tenant:
     id: str
     full_name: str
     whatsapp_number: str
     lease_id: str
-    raw: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Lease:
     id: str
     unit_id: str
@@ -36,7 +39,7 @@ class Lease:
     raw: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Unit:
     id: str
     landlord_id: str
@@ -44,28 +47,25 @@ class Unit:
     address: str
     city: str
     jurisdiction: str | None
-    raw: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Payment:
     due_date: str
     amount_due: float
     amount_paid: float | None
     status: str | None
     paid_date: str | None
-    raw: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PaymentPlan:
     installment_amount: float
     installment_frequency: str | None
     status: str | None
-    raw: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MaintenanceRequest:
     id: str
     category: str | None
@@ -73,43 +73,38 @@ class MaintenanceRequest:
     urgency: str | None
     status: str | None
     created_at: str | None
-    raw: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LegalAction:
     id: str
     action_type: str
     status: str | None
     response_deadline: str | None
-    raw: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Dispute:
     id: str
     category: str | None
     description: str
     status: str | None
     opened_at: str | None
-    raw: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Conversation:
     id: str
     direction: str
     message_body: str
     timestamp: str | None
-    raw: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ConversationContext:
     lease_id: str
     summary: str | None
     open_threads: dict[str, Any]
-    raw: dict[str, Any]
 
 
 @dataclass
@@ -118,6 +113,7 @@ class TenantContext:
     lease: Lease
     unit: Unit
     landlord_id: str
+    landlord: dict[str, Any] | None = None
     recent_conversations: list[Conversation] = field(default_factory=list)
     conversation_context: ConversationContext | None = None
     recent_payments: list[Payment] = field(default_factory=list)
@@ -129,35 +125,145 @@ class TenantContext:
     pending_media_urls: list[str] = field(default_factory=list)
 
 
+# ---------------------------------------------------------------------------
+# Context cache
+# ---------------------------------------------------------------------------
+
+# A tenant chatting live sends several messages a minute, so keep the raw RPC
+# payload per number briefly. The per-turn writes below (conversation rows,
+# conversation_context) are applied to the cached payload; anything else that
+# changes a lease's rows must call invalidate_tenant_context. Writes from other
+# processes show up once the entry expires.
+_TENANT_CONTEXT_TTL = 30.0
+_TENANT_CONTEXT_MAX = 1024
+# phone -> (expires_at, lease_id, orjson-encoded payload); stored encoded so
+# every load builds its dataclasses from a private copy
+_tenant_context_cache: dict[str, tuple[float, str, bytes]] = {}
+
+
+def invalidate_tenant_context(lease_id: str) -> None:
+    """Drop cached context for every tenant on the lease."""
+    for phone in [p for p, (_, lid, _) in _tenant_context_cache.items() if lid == lease_id]:
+        _tenant_context_cache.pop(phone, None)
+
+
+def _patch_cached_context(lease_id: str, patch: Callable[[dict], None]) -> None:
+    """Apply one of our own writes to the lease's cached payloads in place."""
+    for phone, (expires, lid, blob) in list(_tenant_context_cache.items()):
+        if lid == lease_id:
+            data = orjson.loads(blob)
+            patch(data)
+            _tenant_context_cache[phone] = (expires, lid, orjson.dumps(data))
+
+
+def _cache_conversation(lease_id: str, row: dict[str, Any]) -> None:
+    def patch(data: dict) -> None:
+        # Newest first, capped like the RPC's select
+        data["conversations"] = [row, *(data.get("conversations") or [])][:10]
+    _patch_cached_context(lease_id, patch)
+
+
+def _cache_conversation_context(lease_id: str, fields: dict[str, Any]) -> None:
+    def patch(data: dict) -> None:
+        data["conversation_context"] = {**(data.get("conversation_context") or {}), **fields}
+    _patch_cached_context(lease_id, patch)
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Row → dataclass builders for load_tenant_context's related sets
+
+def _conv(row: dict) -> Conversation:
+    return Conversation(
+        id=row["id"],
+        direction=row["direction"],
+        message_body=row["message_body"],
+        timestamp=row.get("timestamp"),
+    )
+
+
+def _payment(row: dict) -> Payment:
+    return Payment(
+        due_date=row["due_date"],
+        amount_due=float(row["amount_due"]),
+        amount_paid=float(row["amount_paid"]) if row.get("amount_paid") is not None else None,
+        status=row.get("status"),
+        paid_date=row.get("paid_date"),
+    )
+
+
+def _maintenance(row: dict) -> MaintenanceRequest:
+    return MaintenanceRequest(
+        id=row["id"],
+        category=row.get("category"),
+        description=row.get("description", ""),
+        urgency=row.get("urgency"),
+        status=row.get("status"),
+        created_at=row.get("created_at"),
+    )
+
+
+def _legal(row: dict) -> LegalAction:
+    return LegalAction(
+        id=row["id"],
+        action_type=row["action_type"],
+        status=row.get("status"),
+        response_deadline=row.get("response_deadline"),
+    )
+
+
+def _dispute(row: dict) -> Dispute:
+    return Dispute(
+        id=row["id"],
+        category=row.get("category"),
+        description=row.get("description", ""),
+        status=row.get("status"),
+        opened_at=row.get("opened_at"),
+    )
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
-async def load_tenant_context(whatsapp_number: str) -> TenantContext | None:
+async def load_tenant_context(whatsapp_number: str, bypass_cache: bool = False) -> TenantContext | None:
     sb = _get_supabase()
 
     # Strip whatsapp: prefix if present
     phone = whatsapp_number.removeprefix("whatsapp:")
 
-    tenant_res = sb.table("tenants").select("*").eq("whatsapp_number", phone).maybe_single().execute()
-    if not tenant_res or not tenant_res.data:
-        return None
-    t = tenant_res.data
+    now = time.monotonic()
+    cached = None if bypass_cache else _tenant_context_cache.get(phone)
+    if cached and cached[0] > now:
+        data = orjson.loads(cached[2])
+    else:
+        # tenant → lease → unit (+ landlord) and every related set in one round trip;
+        # see migrations/005_load_tenant_context.sql
+        res = await asyncio.to_thread(
+            sb.rpc("load_tenant_context", {"p_whatsapp_number": phone}).execute
+        )
+        data = res.data if res else None
+        if not data:
+            _tenant_context_cache.pop(phone, None)
+            return None
+        if len(_tenant_context_cache) >= _TENANT_CONTEXT_MAX:
+            for stale in [p for p, (expires, _, _) in _tenant_context_cache.items() if expires <= now]:
+                _tenant_context_cache.pop(stale, None)
+            if len(_tenant_context_cache) >= _TENANT_CONTEXT_MAX:
+                _tenant_context_cache.pop(next(iter(_tenant_context_cache)), None)
+        _tenant_context_cache[phone] = (now + _TENANT_CONTEXT_TTL, data["lease"]["id"], orjson.dumps(data))
+
+    t = data["tenant"]
     tenant = Tenant(
         id=t["id"],
         full_name=t["full_name"],
         whatsapp_number=t["whatsapp_number"],
         lease_id=t.get("lease_id") or "",
-        raw=t,
     )
 
-    if not tenant.lease_id:
-        return None
-
-    lease_res = sb.table("leases").select("*").eq("id", tenant.lease_id).single().execute()
-    if not lease_res.data:
-        return None
-    l = lease_res.data
+    l = data["lease"]
     lease = Lease(
         id=l["id"],
         unit_id=l["unit_id"],
@@ -168,10 +274,8 @@ async def load_tenant_context(whatsapp_number: str) -> TenantContext | None:
         raw=l,
     )
 
-    unit_res = sb.table("units").select("*").eq("id", lease.unit_id).single().execute()
-    if not unit_res.data:
-        return None
-    u = unit_res.data
+    u = data["unit"]
+    landlord = data.get("landlord")
     unit = Unit(
         id=u["id"],
         landlord_id=u["landlord_id"],
@@ -179,68 +283,10 @@ async def load_tenant_context(whatsapp_number: str) -> TenantContext | None:
         address=u["address"],
         city=u["city"],
         jurisdiction=u.get("jurisdiction"),
-        raw=u,
-    )
-
-    # Fetch remaining context in parallel-ish (supabase-py is sync, so sequential)
-    conversations_res = (
-        sb.table("conversations")
-        .select("*")
-        .eq("lease_id", lease.id)
-        .order("timestamp", desc=True)
-        .limit(10)
-        .execute()
-    )
-    context_res = (
-        sb.table("conversation_context")
-        .select("*")
-        .eq("lease_id", lease.id)
-        .maybe_single()
-        .execute()
-    )
-    payments_res = (
-        sb.table("payments")
-        .select("*")
-        .eq("lease_id", lease.id)
-        .order("due_date", desc=True)
-        .limit(6)
-        .execute()
-    )
-    payment_plan_res = (
-        sb.table("payment_plans")
-        .select("*")
-        .eq("lease_id", lease.id)
-        .eq("status", "active")
-        .maybe_single()
-        .execute()
-    )
-    maintenance_res = (
-        sb.table("maintenance_requests")
-        .select("*")
-        .eq("lease_id", lease.id)
-        .in_("status", ["open", "assigned", "in_progress"])
-        .order("created_at", desc=True)
-        .execute()
-    )
-    legal_res = (
-        sb.table("legal_actions")
-        .select("*")
-        .eq("lease_id", lease.id)
-        .in_("status", ["issued", "acknowledged"])
-        .order("issued_at", desc=True)
-        .execute()
-    )
-    disputes_res = (
-        sb.table("disputes")
-        .select("*")
-        .eq("lease_id", lease.id)
-        .in_("status", ["open", "under_review"])
-        .order("opened_at", desc=True)
-        .execute()
     )
 
     # Parse conversation context & escalation level
-    ctx_data = context_res.data if context_res else None
+    ctx_data = data.get("conversation_context")
     conversation_context: ConversationContext | None = None
     escalation_level = 1
     pending_media_urls: list[str] = []
@@ -255,72 +301,21 @@ async def load_tenant_context(whatsapp_number: str) -> TenantContext | None:
             lease_id=ctx_data["lease_id"],
             summary=ctx_data.get("summary"),
             open_threads=open_threads,
-            raw=ctx_data,
-        )
-
-    def _conv(row: dict) -> Conversation:
-        return Conversation(
-            id=row["id"],
-            direction=row["direction"],
-            message_body=row["message_body"],
-            timestamp=row.get("timestamp"),
-            raw=row,
         )
 
-    raw_convs = conversations_res.data or []
+    raw_convs = data.get("conversations") or []
     # reverse so they are chronological (oldest first → Claude history order)
-    recent_conversations = [_conv(r) for r in reversed(raw_convs)]
-
-    def _payment(row: dict) -> Payment:
-        return Payment(
-            due_date=row["due_date"],
-            amount_due=float(row["amount_due"]),
-            amount_paid=float(row["amount_paid"]) if row.get("amount_paid") is not None else None,
-            status=row.get("status"),
-            paid_date=row.get("paid_date"),
-            raw=row,
-        )
+    recent_conversations = list(map(_conv, raw_convs[::-1]))
 
-    recent_payments = [_payment(r) for r in (payments_res.data or [])]
+    recent_payments = list(map(_payment, data.get("payments") or []))
 
     active_payment_plan: PaymentPlan | None = None
-    if payment_plan_res and payment_plan_res.data:
-        pp = payment_plan_res.data
+    pp = data.get("payment_plan")
+    if pp:
         active_payment_plan = PaymentPlan(
             installment_amount=float(pp["installment_amount"]),
             installment_frequency=pp.get("installment_frequency"),
             status=pp.get("status"),
-            raw=pp,
-        )
-
-    def _maintenance(row: dict) -> MaintenanceRequest:
-        return MaintenanceRequest(
-            id=row["id"],
-            category=row.get("category"),
-            description=row.get("description", ""),
-            urgency=row.get("urgency"),
-            status=row.get("status"),
-            created_at=row.get("created_at"),
-            raw=row,
-        )
-
-    def _legal(row: dict) -> LegalAction:
-        return LegalAction(
-            id=row["id"],
-            action_type=row["action_type"],
-            status=row.get("status"),
-            response_deadline=row.get("response_deadline"),
-            raw=row,
-        )
-
-    def _dispute(row: dict) -> Dispute:
-        return Dispute(
-            id=row["id"],
-            category=row.get("category"),
-            description=row.get("description", ""),
-            status=row.get("status"),
-            opened_at=row.get("opened_at"),
-            raw=row,
         )
 
     return TenantContext(
@@ -328,18 +323,37 @@ async def load_tenant_context(whatsapp_number: str) -> TenantContext | None:
         lease=lease,
         unit=unit,
         landlord_id=unit.landlord_id,
+        landlord=landlord,
         recent_conversations=recent_conversations,
         conversation_context=conversation_context,
         recent_payments=recent_payments,
         active_payment_plan=active_payment_plan,
-        open_maintenance_requests=[_maintenance(r) for r in (maintenance_res.data or [])],
-        open_legal_actions=[_legal(r) for r in (legal_res.data or [])],
-        open_disputes=[_dispute(r) for r in (disputes_res.data or [])],
+        open_maintenance_requests=list(map(_maintenance, data.get("maintenance_requests") or [])),
+        open_legal_actions=list(map(_legal, data.get("legal_actions") or [])),
+        open_disputes=list(map(_dispute, data.get("disputes") or [])),
         escalation_level=escalation_level,
         pending_media_urls=pending_media_urls,
     )
 
 
+SUMMARY_MAX_CHARS = 1000
+
+
+def append_summary_entry(summary: str, entry: str, limit: int = SUMMARY_MAX_CHARS) -> str:
+    """
+    Append a line to a rolling conversation summary, keeping the last `limit`
+    characters. Only the tail of the old summary that survives is copied.
+    """
+    summary = summary.lstrip()
+    if not summary:
+        return entry.strip()[-limit:]
+    entry = entry.rstrip()
+    keep = limit - len(entry) - 1
+    if keep <= 0:
+        return ("\n" + entry)[-limit:]
+    return f"{summary[-keep:]}\n{entry}"
+
+
 async def log_conversation(
     lease_id: str,
     direction: str,
@@ -362,6 +376,7 @@ async def log_conversation(
         )
         print(f"[log_conversation] insert response data={res.data}")
         if res.data:
+            _cache_conversation(lease_id, res.data[0])
             return res.data[0]["id"]
         print(f"[log_conversation] WARNING: insert returned no data (no error raised). lease_id={lease_id}")
         return None
@@ -370,6 +385,59 @@ async def log_conversation(
         return None
 
 
+# agent_actions rows are an append-only audit trail nobody reads back mid-turn,
+# so they are queued and written by one background task as a single bulk
+# insert per ~50 ms (or per 100 rows) instead of one blocking insert each.
+_AGENT_ACTION_FLUSH_INTERVAL = 0.05
+_AGENT_ACTION_BATCH_MAX = 100
+_agent_action_queue: asyncio.Queue[dict[str, Any] | None] | None = None
+_agent_action_writer: asyncio.Task | None = None
+
+
+async def _insert_agent_actions(rows: list[dict[str, Any]]) -> None:
+    try:
+        await asyncio.to_thread(_get_supabase().table("agent_actions").insert(rows).execute)
+    except Exception as exc:
+        print(f"[log_agent_action] ERROR inserting {len(rows)} agent_actions rows: {exc!r}")
+
+
+async def _write_agent_actions(queue: asyncio.Queue[dict[str, Any] | None]) -> None:
+    """Drain the queue in batches until a None sentinel arrives."""
+    loop = asyncio.get_running_loop()
+    while True:
+        row = await queue.get()
+        if row is None:
+            return
+        batch = [row]
+        stop = False
+        deadline = loop.time() + _AGENT_ACTION_FLUSH_INTERVAL
+        while len(batch) < _AGENT_ACTION_BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                row = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if row is None:
+                stop = True
+                break
+            batch.append(row)
+        await _insert_agent_actions(batch)
+        if stop:
+            return
+
+
+async def flush_agent_actions() -> None:
+    """Insert whatever is still queued and stop the background writer (app shutdown)."""
+    global _agent_action_queue, _agent_action_writer
+    queue, writer = _agent_action_queue, _agent_action_writer
+    _agent_action_queue = _agent_action_writer = None
+    if queue is not None and writer is not None and not writer.done():
+        queue.put_nowait(None)
+        await writer
+
+
 async def log_agent_action(
     lease_id: str,
     action_category: str,
@@ -379,8 +447,11 @@ async def log_agent_action(
     output_summary: str | None = None,
     confidence_score: float | None = None,
 ) -> None:
-    sb = _get_supabase()
-    sb.table("agent_actions").insert({
+    global _agent_action_queue, _agent_action_writer
+    if _agent_action_writer is None or _agent_action_writer.done():
+        _agent_action_queue = asyncio.Queue()
+        _agent_action_writer = asyncio.create_task(_write_agent_actions(_agent_action_queue))
+    _agent_action_queue.put_nowait({
         "lease_id": lease_id,
         "action_category": action_category,
         "action_description": action_description,
@@ -388,7 +459,7 @@ async def log_agent_action(
         "input_summary": input_summary,
         "output_summary": output_summary,
         "confidence_score": confidence_score,
-    }).execute()
+    })
 
 
 async def update_conversation_context(
@@ -397,22 +468,64 @@ async def update_conversation_context(
     open_threads: dict[str, Any],
 ) -> None:
     sb = _get_supabase()
-    from datetime import datetime, timezone
-    sb.table("conversation_context").upsert(
-        {
+    row = {
+        "lease_id": lease_id,
+        "summary": summary,
+        "open_threads": open_threads,
+        "last_updated": _now_iso(),
+    }
+    sb.table("conversation_context").upsert(row, on_conflict="lease_id").execute()
+    _cache_conversation_context(lease_id, row)
+
+
+async def record_agent_turn(
+    lease_id: str,
+    reply_message: str,
+    intent_classification: str | None = None,
+    summary: str | None = None,
+    open_threads: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> None:
+    """
+    Persist the end of a tenant turn in one RPC: the outbound conversation row,
+    an agent_actions row when the agent failed, and the refreshed
+    conversation_context when a summary is given (see migration 004).
+    """
+    sb = _get_supabase()
+    try:
+        res = await asyncio.to_thread(sb.rpc("record_agent_turn", {
+            "p_lease_id": lease_id,
+            "p_reply": reply_message,
+            "p_intent_classification": intent_classification,
+            "p_summary": summary,
+            "p_open_threads": open_threads,
+            "p_error": error,
+        }).execute)
+    except Exception:
+        invalidate_tenant_context(lease_id)
+        raise
+
+    now_iso = _now_iso()
+    _cache_conversation(lease_id, {
+        "id": res.data if res else None,
+        "lease_id": lease_id,
+        "direction": "outbound",
+        "message_body": reply_message,
+        "intent_classification": intent_classification,
+        "timestamp": now_iso,
+    })
+    if summary is not None:
+        _cache_conversation_context(lease_id, {
             "lease_id": lease_id,
             "summary": summary,
-            "open_threads": open_threads,
-            "last_updated": datetime.now(timezone.utc).isoformat(),
-        },
-        on_conflict="lease_id",
-    ).execute()
+            "open_threads": open_threads or {},
+            "last_updated": now_iso,
+        })
 
 
 async def save_pending_media_urls(lease_id: str, media_urls: list[str]) -> None:
     """Persist photo URLs from an image-only WhatsApp message so they survive to the next message."""
     sb = _get_supabase()
-    from datetime import datetime, timezone
     existing = sb.table("conversation_context").select("open_threads").eq("lease_id", lease_id).maybe_single().execute()
     open_threads = {}
     if existing and existing.data:
@@ -426,12 +539,12 @@ async def save_pending_media_urls(lease_id: str, media_urls: list[str]) -> None:
         },
         on_conflict="lease_id",
     ).execute()
+    invalidate_tenant_context(lease_id)
 
 
 async def clear_pending_media_urls(lease_id: str, current_open_threads: dict[str, Any]) -> None:
     """Remove pending_media_urls from open_threads after they've been attached to a maintenance request."""
     sb = _get_supabase()
-    from datetime import datetime, timezone
     updated = {k: v for k, v in current_open_threads.items() if k != "pending_media_urls"}
     sb.table("conversation_context").upsert(
         {
@@ -441,3 +554,4 @@ async def clear_pending_media_urls(lease_id: str, current_open_threads: dict[str
         },
         on_conflict="lease_id",
     ).execute()
+    invalidate_tenant_context(lease_id)
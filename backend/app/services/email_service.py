@@ -1,38 +1,27 @@
 from __future__ import annotations
 
 import smtplib
+import string
+import threading
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 from app.config import settings
 
+# One authenticated Gmail session per process, reused while it stays alive, so
+# repeat sends skip the connect + STARTTLS + LOGIN round trips. Gmail drops idle
+# sessions, so one unused for longer than _SMTP_IDLE_TIMEOUT is reopened.
+_SMTP_IDLE_TIMEOUT = 60.0
+_smtp: smtplib.SMTP | None = None
+_smtp_last_used = 0.0
+_smtp_lock = threading.Lock()
 
-def send_maintenance_email(
-    to_email: str,
-    property_address: str,
-    unit_identifier: str,
-    tenant_name: str,
-    category: str,
-    urgency: str,
-    description: str,
-    request_id: str,
-    contractor_name: str | None = None,
-) -> bool:
-    """
-    Send a maintenance job notification email via Gmail SMTP.
-    Returns True if sent successfully, False otherwise.
-    If GMAIL_ADDRESS or GMAIL_APP_PASSWORD are not configured, logs a warning and skips.
-    """
-    if not settings.GMAIL_ADDRESS or not settings.GMAIL_APP_PASSWORD:
-        print("[email_service] Gmail credentials not configured — skipping maintenance email.")
-        return False
+_URGENCY_LABELS = {"emergency": "🚨 EMERGENCY", "high": "⚠️ HIGH PRIORITY", "routine": "📋 Routine"}
+_URGENCY_COLORS = {"emergency": "#d32f2f", "high": "#f57c00"}
 
-    urgency_label = {"emergency": "🚨 EMERGENCY", "high": "⚠️ HIGH PRIORITY", "routine": "📋 Routine"}.get(
-        urgency, urgency.upper()
-    )
-    subject = f"[{urgency_label}] New Maintenance Job — {unit_identifier}, {property_address}"
-
-    html_body = f"""
+# Compiled once; send_maintenance_email only substitutes the field values
+_HTML_TMPL = string.Template("""
 <html>
 <body style="font-family: Arial, sans-serif; color: #333; max-width: 600px; margin: 0 auto;">
   <div style="background: #1a1a2e; padding: 20px; border-radius: 8px 8px 0 0;">
@@ -43,31 +32,31 @@ def send_maintenance_email(
     <table style="width: 100%; border-collapse: collapse;">
       <tr>
         <td style="padding: 8px 0; font-weight: bold; width: 160px; color: #555;">Request ID</td>
-        <td style="padding: 8px 0; font-family: monospace;">{request_id}</td>
+        <td style="padding: 8px 0; font-family: monospace;">$request_id</td>
       </tr>
       <tr style="background: #f9f9f9;">
         <td style="padding: 8px; font-weight: bold; color: #555;">Urgency</td>
-        <td style="padding: 8px; font-weight: bold; color: {'#d32f2f' if urgency == 'emergency' else '#f57c00' if urgency == 'high' else '#388e3c'};">
-          {urgency_label}
+        <td style="padding: 8px; font-weight: bold; color: $urgency_color;">
+          $urgency_label
         </td>
       </tr>
       <tr>
         <td style="padding: 8px 0; font-weight: bold; color: #555;">Property</td>
-        <td style="padding: 8px 0;">{unit_identifier} — {property_address}</td>
+        <td style="padding: 8px 0;">$unit_identifier — $property_address</td>
       </tr>
       <tr style="background: #f9f9f9;">
         <td style="padding: 8px; font-weight: bold; color: #555;">Tenant</td>
-        <td style="padding: 8px;">{tenant_name}</td>
+        <td style="padding: 8px;">$tenant_name</td>
       </tr>
       <tr>
         <td style="padding: 8px 0; font-weight: bold; color: #555;">Category</td>
-        <td style="padding: 8px 0; text-transform: capitalize;">{category}</td>
+        <td style="padding: 8px 0; text-transform: capitalize;">$category</td>
       </tr>
       <tr style="background: #f9f9f9;">
         <td style="padding: 8px; font-weight: bold; color: #555; vertical-align: top;">Issue Description</td>
-        <td style="padding: 8px;">{description}</td>
+        <td style="padding: 8px;">$description</td>
       </tr>
-      {'<tr><td style="padding: 8px 0; font-weight: bold; color: #555;">Assigned To</td><td style="padding: 8px 0;">' + contractor_name + '</td></tr>' if contractor_name else ''}
+      $assigned_row
     </table>
 
     <div style="margin-top: 20px; padding: 12px; background: #fff8e1; border-left: 4px solid #ffc107; border-radius: 4px;">
@@ -79,7 +68,92 @@ def send_maintenance_email(
   </p>
 </body>
 </html>
-"""
+""")
+
+_ASSIGNED_ROW_TMPL = string.Template(
+    '<tr><td style="padding: 8px 0; font-weight: bold; color: #555;">Assigned To</td>'
+    '<td style="padding: 8px 0;">$contractor_name</td></tr>'
+)
+
+
+def _close_smtp() -> None:
+    global _smtp
+    if _smtp is not None:
+        try:
+            _smtp.quit()
+        except Exception:
+            _smtp.close()
+        _smtp = None
+
+
+def _get_smtp() -> smtplib.SMTP:
+    """Return a live, logged-in session, reconnecting if it is idle or dead. Caller holds _smtp_lock."""
+    global _smtp
+    if _smtp is not None and time.monotonic() - _smtp_last_used < _SMTP_IDLE_TIMEOUT:
+        try:
+            if _smtp.noop()[0] == 250:
+                return _smtp
+        except (smtplib.SMTPException, OSError):
+            pass
+    _close_smtp()
+    server = smtplib.SMTP("smtp.gmail.com", 587, timeout=30)
+    server.ehlo()
+    server.starttls()
+    server.login(settings.GMAIL_ADDRESS, settings.GMAIL_APP_PASSWORD)
+    _smtp = server
+    return server
+
+
+def _sendmail(to_email: str, message: str) -> None:
+    global _smtp_last_used
+    with _smtp_lock:
+        try:
+            try:
+                _get_smtp().sendmail(settings.GMAIL_ADDRESS, to_email, message)
+            except smtplib.SMTPServerDisconnected:
+                # Dropped between the liveness probe and the send — reconnect once
+                _close_smtp()
+                _get_smtp().sendmail(settings.GMAIL_ADDRESS, to_email, message)
+        except Exception:
+            _close_smtp()
+            raise
+        _smtp_last_used = time.monotonic()
+
+
+def send_maintenance_email(
+    to_email: str,
+    property_address: str,
+    unit_identifier: str,
+    tenant_name: str,
+    category: str,
+    urgency: str,
+    description: str,
+    request_id: str,
+    contractor_name: str | None = None,
+) -> bool:
+    """
+    Send a maintenance job notification email via Gmail SMTP.
+    Returns True if sent successfully, False otherwise.
+    If GMAIL_ADDRESS or GMAIL_APP_PASSWORD are not configured, logs a warning and skips.
+    """
+    if not settings.GMAIL_ADDRESS or not settings.GMAIL_APP_PASSWORD:
+        print("[email_service] Gmail credentials not configured — skipping maintenance email.")
+        return False
+
+    urgency_label = _URGENCY_LABELS.get(urgency, urgency.upper())
+    subject = f"[{urgency_label}] New Maintenance Job — {unit_identifier}, {property_address}"
+
+    html_body = _HTML_TMPL.substitute(
+        request_id=request_id,
+        urgency_color=_URGENCY_COLORS.get(urgency, "#388e3c"),
+        urgency_label=urgency_label,
+        unit_identifier=unit_identifier,
+        property_address=property_address,
+        tenant_name=tenant_name,
+        category=category,
+        description=description,
+        assigned_row=_ASSIGNED_ROW_TMPL.substitute(contractor_name=contractor_name) if contractor_name else "",
+    )
 
     text_body = (
         f"MAINTENANCE REQUEST — {urgency.upper()}\n"
@@ -102,11 +176,7 @@ def send_maintenance_email(
     msg.attach(MIMEText(html_body, "html"))
 
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.ehlo()
-            server.starttls()
-            server.login(settings.GMAIL_ADDRESS, settings.GMAIL_APP_PASSWORD)
-            server.sendmail(settings.GMAIL_ADDRESS, to_email, msg.as_string())
+        _sendmail(to_email, msg.as_string())
         print(f"[email_service] Maintenance email sent to {to_email} for request {request_id}")
         return True
     except Exception as exc:
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import httpx
+
+_http: httpx.AsyncClient | None = None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    One pooled AsyncClient per process for outbound calls (Instagram Graph API,
+    image downloads), so repeat requests to the same host reuse the open TLS
+    connection instead of handshaking again. Closed by the app lifespan.
+    """
+    global _http
+    if _http is None or _http.is_closed:
+        _http = httpx.AsyncClient(
+            timeout=httpx.Timeout(15.0, connect=10.0),
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=True,
+        )
+    return _http
+
+
+async def close_http_client() -> None:
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
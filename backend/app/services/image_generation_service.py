@@ -1,26 +1,43 @@
 from __future__ import annotations
 
+import asyncio
+import tempfile
+import threading
 import uuid
+from io import BufferedReader, FileIO
 from typing import Any
 
-from supabase import create_client
-
-from app.config import settings
+from app.database import supabase
+from app.services.http_client import get_http_client
 
 
 BUCKET_NAME = "property-listings"
 
 
 def _sb():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
+
+
+# Buckets known to exist, so only the first upload per process pays the
+# create_bucket round trip
+_bucket_ensured: set[str] = set()
+_bucket_lock = threading.Lock()
 
 
 def _ensure_bucket() -> None:
-    sb = _sb()
-    try:
-        sb.storage.create_bucket(BUCKET_NAME, options={"public": True})
-    except Exception:
-        pass  # Bucket already exists
+    if BUCKET_NAME in _bucket_ensured:
+        return
+    with _bucket_lock:
+        if BUCKET_NAME in _bucket_ensured:
+            return
+        sb = _sb()
+        try:
+            sb.storage.create_bucket(BUCKET_NAME, options={"public": True})
+        except Exception as exc:
+            message = str(exc).lower()
+            if "already exists" not in message and "duplicate" not in message:
+                return  # Unknown failure — let the upload surface it and retry next time
+        _bucket_ensured.add(BUCKET_NAME)
 
 
 
@@ -51,15 +68,16 @@ async def generate_property_image(
 
 
 
-async def _upload_to_supabase(image_bytes: bytes, path: str) -> str | None:
+async def _upload_to_supabase(image: bytes | BufferedReader | FileIO, *, path: str) -> str | None:
     try:
         _ensure_bucket()
         sb = _sb()
         filename = f"{path}/{uuid.uuid4()}.jpg"
 
-        sb.storage.from_(BUCKET_NAME).upload(
+        await asyncio.to_thread(
+            sb.storage.from_(BUCKET_NAME).upload,
             filename,
-            image_bytes,
+            image,
             {"content-type": "image/jpeg", "upsert": "true"},
         )
 
@@ -73,15 +91,21 @@ async def _upload_to_supabase(image_bytes: bytes, path: str) -> str | None:
 
 async def _fetch_and_upload(source_url: str, unit_id: str, label: str = "image") -> str | None:
     """Download *source_url* and re-host it on Supabase Storage.  Returns the public URL or None."""
-    import httpx
-
     try:
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-            resp = await client.get(source_url)
-            resp.raise_for_status()
-            image_bytes = resp.content
+        client = await get_http_client()
+        # Stream to a temp file and hand the upload a file handle, so a large
+        # photo is never held in memory in full
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as tmp:
+            async with client.stream("GET", source_url) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.aiter_bytes(1 << 16):
+                    tmp.write(chunk)
+            tmp.flush()
+            tmp.seek(0)
+            # Upload from the open handle rather than reopening by name, which
+            # Windows refuses while the temp file is still open
+            public_url = await _upload_to_supabase(tmp.file.raw, path=f"{unit_id}-{label}")
 
-        public_url = await _upload_to_supabase(image_bytes, f"{unit_id}-{label}")
         if public_url:
             print(f"[ImageGen] {label} uploaded to Supabase: {public_url}")
             return public_url
@@ -1,27 +1,48 @@
 from __future__ import annotations
 
-import httpx
+import asyncio
 
 from app.config import settings
+from app.services.http_client import get_http_client
 
 IG_API_BASE = "https://graph.instagram.com/v21.0"
 
+# The token -> account user ID mapping is fixed for the token's lifetime, so it
+# is resolved once per token rather than on every DM.
+_ig_user_ids: dict[str, str] = {}
+_ig_user_id_lock = asyncio.Lock()
 
-async def _get_ig_user_id(token: str) -> str | None:
+
+async def get_ig_user_id(token: str) -> str | None:
     """Fetch the Instagram Business/Creator account user ID from the access token."""
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+    cached = _ig_user_ids.get(token)
+    if cached:
+        return cached
+    async with _ig_user_id_lock:
+        cached = _ig_user_ids.get(token)
+        if cached:
+            return cached
+        try:
+            client = await get_http_client()
             resp = await client.get(
                 "https://graph.instagram.com/me",
                 params={"fields": "user_id", "access_token": token},
             )
             data = resp.json()
-            return data.get("user_id") or data.get("id")
-    except Exception as exc:
-        print(f"[InstagramDM] Error fetching user ID: {exc}")
+            user_id = data.get("user_id") or data.get("id")
+            if user_id:
+                _ig_user_ids[token] = user_id
+            return user_id
+        except Exception as exc:
+            print(f"[InstagramDM] Error fetching user ID: {exc}")
     return None
 
 
+def _is_auth_error(status_code: int, data: dict) -> bool:
+    error = data.get("error") or {}
+    return status_code == 401 or error.get("code") == 190 or error.get("type") == "OAuthException"
+
+
 async def send_instagram_dm(recipient_igsid: str, message: str) -> bool:
     """
     Send a direct message to an Instagram user via the Messenger API for Instagram.
@@ -37,13 +58,14 @@ async def send_instagram_dm(recipient_igsid: str, message: str) -> bool:
         print("[InstagramDM] INSTAGRAM_ACCESS_TOKEN not configured — skipping DM send")
         return False
 
-    ig_user_id = await _get_ig_user_id(token)
-    if not ig_user_id:
-        print("[InstagramDM] Could not resolve IG user ID — cannot send DM")
-        return False
+    for attempt in range(2):
+        ig_user_id = await get_ig_user_id(token)
+        if not ig_user_id:
+            print("[InstagramDM] Could not resolve IG user ID — cannot send DM")
+            return False
 
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        try:
+            client = await get_http_client()
             resp = await client.post(
                 f"{IG_API_BASE}/{ig_user_id}/messages",
                 params={"access_token": token},
@@ -55,8 +77,13 @@ async def send_instagram_dm(recipient_igsid: str, message: str) -> bool:
             data = resp.json()
             if "message_id" in data or "recipient_id" in data:
                 return True
+            if attempt == 0 and _is_auth_error(resp.status_code, data):
+                # Token rotated or the cached account ID went stale — re-resolve once.
+                _ig_user_ids.pop(token, None)
+                continue
             print(f"[InstagramDM] Send failed: {data}")
-    except Exception as exc:
-        print(f"[InstagramDM] Exception sending DM: {exc}")
+        except Exception as exc:
+            print(f"[InstagramDM] Exception sending DM: {exc}")
+        break
 
     return False
@@ -7,8 +7,13 @@ from typing import Any
 import httpx
 
 from app.config import settings
+from app.services.http_client import get_http_client
+from app.services.instagram_dm_service import get_ig_user_id
 
 IG_API_BASE = "https://graph.instagram.com/v21.0"
+# Instagram fetches the image while creating/publishing a container, so these
+# calls get longer than the shared client's default read timeout
+_PUBLISH_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
 
 
 @dataclass
@@ -84,24 +89,6 @@ def _build_caption(unit: dict[str, Any], attrs: dict[str, Any] | None, lease: di
     return "\n".join(lines)
 
 
-async def _get_ig_user_id(token: str) -> str | None:
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(
-                "https://graph.instagram.com/me",
-                params={"fields": "user_id", "access_token": token},
-            )
-            data = resp.json()
-            if "user_id" in data:
-                return data["user_id"]
-            if "id" in data:
-                return data["id"]
-            print(f"[Instagram] Could not get user ID: {data}")
-    except Exception as exc:
-        print(f"[Instagram] Error getting user ID: {exc}")
-    return None
-
-
 async def _create_media_container(
     ig_user_id: str,
     image_url: str,
@@ -109,19 +96,20 @@ async def _create_media_container(
     token: str,
 ) -> str | None:
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(
-                f"{IG_API_BASE}/{ig_user_id}/media",
-                data={
-                    "image_url": image_url,
-                    "caption": caption,
-                    "access_token": token,
-                },
-            )
-            data = resp.json()
-            if "id" in data:
-                return data["id"]
-            print(f"[Instagram] Create container error: {data}")
+        client = await get_http_client()
+        resp = await client.post(
+            f"{IG_API_BASE}/{ig_user_id}/media",
+            data={
+                "image_url": image_url,
+                "caption": caption,
+                "access_token": token,
+            },
+            timeout=_PUBLISH_TIMEOUT,
+        )
+        data = resp.json()
+        if "id" in data:
+            return data["id"]
+        print(f"[Instagram] Create container error: {data}")
     except Exception as exc:
         print(f"[Instagram] Create container exception: {exc}")
     return None
@@ -133,18 +121,19 @@ async def _publish_container(
     token: str,
 ) -> str | None:
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(
-                f"{IG_API_BASE}/{ig_user_id}/media_publish",
-                data={
-                    "creation_id": container_id,
-                    "access_token": token,
-                },
-            )
-            data = resp.json()
-            if "id" in data:
-                return data["id"]
-            print(f"[Instagram] Publish error: {data}")
+        client = await get_http_client()
+        resp = await client.post(
+            f"{IG_API_BASE}/{ig_user_id}/media_publish",
+            data={
+                "creation_id": container_id,
+                "access_token": token,
+            },
+            timeout=_PUBLISH_TIMEOUT,
+        )
+        data = resp.json()
+        if "id" in data:
+            return data["id"]
+        print(f"[Instagram] Publish error: {data}")
     except Exception as exc:
         print(f"[Instagram] Publish exception: {exc}")
     return None
@@ -175,7 +164,7 @@ async def post_property_listing(
 
     token = settings.INSTAGRAM_ACCESS_TOKEN
     print("[Instagram] Getting Instagram User ID...")
-    ig_user_id = await _get_ig_user_id(token)
+    ig_user_id = await get_ig_user_id(token)
 
     if not ig_user_id:
         return InstagramPostResult(
@@ -3,15 +3,13 @@ from __future__ import annotations
 from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
-from supabase import create_client
-
-from app.config import settings
-from app.services.context_loader import log_conversation
+from app.database import supabase
+from app.services.context_loader import invalidate_tenant_context, log_conversation
 from app.services.twilio_service import send_whatsapp_message
 
 
 def _sb():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 def _fmt_date(iso: str) -> str:
@@ -91,6 +89,7 @@ async def check_expiring_leases() -> list[str]:
             "renewal_inquiry_sent_at": datetime.now(timezone.utc).isoformat(),
             "renewal_status": "pending",
         }).eq("id", lease_id).execute()
+        invalidate_tenant_context(lease_id)
 
         processed.append(lease_id)
 
@@ -192,6 +191,7 @@ async def trigger_listing_for_lease(lease_id: str) -> dict[str, Any]:
         "instagram_post_url": ig_result.post_url,
     }).eq("id", lease_id).execute()
     print(f"[LeaseExpiry] Lease update result rows: {len(update_res.data) if update_res.data else 0}")
+    invalidate_tenant_context(lease_id)
 
     sb.table("unit_status").upsert({
         "unit_id": unit_id,
@@ -4,15 +4,15 @@ import mimetypes
 import uuid
 
 import httpx
-from supabase import create_client
 
 from app.config import settings
+from app.database import supabase
 
 BUCKET = "maintenance-photos"
 
 
 def _get_supabase():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 def proxy_twilio_media(twilio_url: str) -> str | None:
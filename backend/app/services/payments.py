@@ -13,6 +13,7 @@ from app.schemas.payments import (
     PaymentResponse,
     PropertyBreakdownItem,
 )
+from app.services.context_loader import invalidate_tenant_context
 from app.services.whatsapp import whatsapp_service
 
 logger = logging.getLogger(__name__)
@@ -151,6 +152,7 @@ async def record_payment(req: PaymentRecordRequest) -> PaymentRecordResult:
         "confidence_score": 1.0,
         "timestamp": _now_iso(),
     }).execute()
+    invalidate_tenant_context(lease_id)
 
     return PaymentRecordResult(
         payment=_row_to_response(payment, tenant_name, unit_name),
@@ -244,6 +246,7 @@ async def check_overdue_payments() -> CheckOverdueResult:
             # Still update status if changed
             if new_status != row["status"]:
                 supabase.table("payments").update({"status": new_status}).eq("id", row["id"]).execute()
+                invalidate_tenant_context(row["lease_id"])
             continue
 
         tenant_name = tenant["full_name"] if tenant else "Tenant"
@@ -330,6 +333,7 @@ async def check_overdue_payments() -> CheckOverdueResult:
             "status": new_status,
             "notes": json.dumps(meta),
         }).eq("id", row["id"]).execute()
+        invalidate_tenant_context(lease_id)
 
         # Log agent action
         supabase.table("agent_actions").insert({
@@ -424,7 +428,7 @@ async def generate_monthly_report(
     unit_ids = [u["id"] for u in units]
 
     if not unit_ids:
-        return MonthlyReportResponse(
+        return MonthlyReportResponse.model_construct(
             landlord_id=landlord_id,
             landlord_name=landlord["full_name"],
             period=f"{year}-{month:02d}",
@@ -439,7 +443,7 @@ async def generate_monthly_report(
     lease_ids = [l["id"] for l in leases]
 
     if not lease_ids:
-        return MonthlyReportResponse(
+        return MonthlyReportResponse.model_construct(
             landlord_id=landlord_id,
             landlord_name=landlord["full_name"],
             period=f"{year}-{month:02d}",
@@ -521,7 +525,7 @@ async def generate_monthly_report(
             ).days
 
     late_patterns = [
-        LatePatternItem(
+        LatePatternItem.model_construct(
             tenant_name=v["tenant_name"],
             unit_identifier=v["unit_identifier"],
             times_late=v["times_late"],
@@ -549,7 +553,7 @@ async def generate_monthly_report(
             pstatus = "partially_collected"
         else:
             pstatus = "not_collected"
-        property_breakdown.append(PropertyBreakdownItem(
+        property_breakdown.append(PropertyBreakdownItem.model_construct(
             unit_identifier=unit["unit_identifier"],
             expected=expected,
             collected=collected,
@@ -566,7 +570,7 @@ async def generate_monthly_report(
         .data
     )
 
-    return MonthlyReportResponse(
+    return MonthlyReportResponse.model_construct(
         landlord_id=landlord_id,
         landlord_name=landlord["full_name"],
         period=f"{year}-{month:02d}",
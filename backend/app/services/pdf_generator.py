@@ -10,9 +10,8 @@ from reportlab.lib.units import mm
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
 from reportlab.platypus.flowables import HRFlowable
-from supabase import create_client
 
-from app.config import settings
+from app.database import supabase
 from app.services.context_loader import TenantContext
 
 
@@ -35,7 +34,7 @@ async def generate_legal_notice(
     jurisdiction = ctx.unit.jurisdiction or "england_wales"
 
     # Try to fetch template from DB
-    sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    sb = supabase
     template_res = (
         sb.table("document_templates")
         .select("*")
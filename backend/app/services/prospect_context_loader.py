@@ -1,15 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass, field
 from typing import Any
 
-from supabase import create_client, Client
+from supabase import Client
 
-from app.config import settings
+from app.database import supabase
 
 
 def _get_supabase() -> Client:
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 @dataclass
@@ -54,33 +55,49 @@ async def load_or_create_prospect(phone_number: str) -> ProspectContext:
     sb = _get_supabase()
     phone = phone_number.removeprefix("whatsapp:")
 
-    prospect_res = (
-        sb.table("prospects")
-        .select("*")
-        .eq("phone_number", phone)
-        .maybe_single()
-        .execute()
+    # The unit list doesn't depend on the prospect, so fetch both together
+    prospect_res, units_res = await asyncio.gather(
+        asyncio.to_thread(
+            sb.table("prospects")
+            .select("*")
+            .eq("phone_number", phone)
+            .maybe_single()
+            .execute
+        ),
+        asyncio.to_thread(sb.table("units").select("*, leases(status)").execute),
     )
 
     if prospect_res and prospect_res.data:
         prospect = prospect_res.data
     else:
-        insert_res = (
+        insert_res = await asyncio.to_thread(
             sb.table("prospects")
             .insert({"phone_number": phone, "status": "inquiring"})
-            .execute()
+            .execute
         )
         prospect = insert_res.data[0] if insert_res.data else {"id": "", "phone_number": phone, "status": "inquiring"}
 
     prospect_id = prospect["id"]
 
-    convs_res = (
-        sb.table("prospect_conversations")
-        .select("*")
-        .eq("prospect_id", prospect_id)
-        .order("created_at", desc=True)
-        .limit(10)
-        .execute()
+    # Recent conversations and any pending (unsigned) signing token are
+    # independent reads keyed by the prospect
+    convs_res, token_res = await asyncio.gather(
+        asyncio.to_thread(
+            sb.table("prospect_conversations")
+            .select("*")
+            .eq("prospect_id", prospect_id)
+            .order("created_at", desc=True)
+            .limit(10)
+            .execute
+        ),
+        asyncio.to_thread(
+            sb.table("signing_tokens")
+            .select("*")
+            .eq("prospect_id", prospect_id)
+            .is_("signed_at", "null")
+            .maybe_single()
+            .execute
+        ),
     )
     raw_convs = convs_res.data or []
     recent_conversations = [
@@ -94,7 +111,6 @@ async def load_or_create_prospect(phone_number: str) -> ProspectContext:
         for r in reversed(raw_convs)
     ]
 
-    units_res = sb.table("units").select("*, leases(status)").execute()
     all_units = units_res.data or []
 
     def _is_available(u: dict) -> bool:
@@ -110,25 +126,12 @@ async def load_or_create_prospect(phone_number: str) -> ProspectContext:
                 interested_unit = u
                 break
         if interested_unit is None:
-            unit_res = (
-                sb.table("units")
-                .select("*")
-                .eq("id", prospect["interested_unit_id"])
-                .maybe_single()
-                .execute()
+            # Already let, but it's still in the full unit list fetched above
+            interested_unit = next(
+                (_build_unit(u) for u in all_units if u["id"] == prospect["interested_unit_id"]),
+                None,
             )
-            if unit_res and unit_res.data:
-                interested_unit = _build_unit(unit_res.data)
 
-    # Load any pending (unsigned) signing token for this prospect
-    token_res = (
-        sb.table("signing_tokens")
-        .select("*")
-        .eq("prospect_id", prospect_id)
-        .is_("signed_at", "null")
-        .maybe_single()
-        .execute()
-    )
     pending_signing_token = token_res.data if (token_res and token_res.data) else None
 
     return ProspectContext(
@@ -280,13 +283,13 @@ async def log_prospect_conversation(
     source_channel: str = "whatsapp",
 ) -> None:
     sb = _get_supabase()
-    sb.table("prospect_conversations").insert({
+    await asyncio.to_thread(sb.table("prospect_conversations").insert({
         "prospect_id": prospect_id,
         "direction": direction,
         "message_body": message_body,
         "whatsapp_message_id": whatsapp_message_id,
         "source_channel": source_channel,
-    }).execute()
+    }).execute)
 
 
 async def update_prospect(prospect_id: str, updates: dict[str, Any]) -> None:
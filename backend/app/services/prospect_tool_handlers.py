@@ -1,16 +1,17 @@
 from __future__ import annotations
 
+import io
 from dataclasses import dataclass
 from typing import Any
 
-from supabase import create_client
 
 from app.config import settings
+from app.database import supabase
 from app.services.prospect_context_loader import ProspectContext, update_prospect
 
 
 def _sb():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 @dataclass
@@ -20,7 +21,7 @@ class ProspectToolResult:
     error: str | None = None
 
 
-PROSPECT_AGENT_TOOLS = [
+PROSPECT_AGENT_TOOLS = (
     {
         "name": "get_property_listings",
         "description": (
@@ -72,7 +73,7 @@ PROSPECT_AGENT_TOOLS = [
             "required": ["consent_statement"],
         },
     },
-]
+)
 
 
 async def execute_prospect_tool(
@@ -161,7 +162,7 @@ async def _sign_lease_agreement(inp: dict[str, Any], ctx: ProspectContext) -> Pr
     channel = ctx.source_channel  # 'whatsapp' or 'instagram_dm'
 
     from datetime import datetime, timezone
-    from app.routes.signing import _generate_signed_lease_pdf, _activate_lease_from_signing
+    from app.routes.signing import _activate_lease_from_signing, _render_signed_lease_pdf
 
     sb = _sb()
     signed_at = datetime.now(timezone.utc).isoformat()
@@ -172,7 +173,7 @@ async def _sign_lease_agreement(inp: dict[str, Any], ctx: ProspectContext) -> Pr
         f"Digitally signed via {channel_label} on {datetime.now(timezone.utc).strftime('%d %B %Y at %H:%M UTC')}.\n"
         f"Consent statement: \"{consent_statement}\""
     )
-    # Encode as a plain-text data URL so the PDF renderer can display it
+    # Stored as a plain-text data URL; the PDF shows the text itself as the signature
     import base64
     sig_b64 = base64.b64encode(sig_text.encode()).decode()
     signature_data_url = f"data:text/plain;base64,{sig_b64}"
@@ -180,10 +181,10 @@ async def _sign_lease_agreement(inp: dict[str, Any], ctx: ProspectContext) -> Pr
     # Generate the signed PDF
     pdf_url: str | None = None
     try:
-        pdf_bytes = _generate_signed_lease_pdf(token_row, signature_data_url)
+        pdf_buf = _render_signed_lease_pdf(token_row, None, sig_text=sig_text)
         filename = f"signed_lease_{token_id[:8]}_{datetime.now().strftime('%Y%m%d')}.pdf"
         upload_res = sb.storage.from_("leases-signed").upload(
-            filename, pdf_bytes, {"content-type": "application/pdf", "upsert": "false"}
+            filename, io.BufferedReader(pdf_buf), {"content-type": "application/pdf", "upsert": "false"}
         )
         if upload_res:
             pdf_url = sb.storage.from_("leases-signed").get_public_url(filename)
@@ -204,8 +205,8 @@ async def _sign_lease_agreement(inp: dict[str, Any], ctx: ProspectContext) -> Pr
     }).eq("id", ctx.prospect_id).execute()
 
     # Activate the lease — creates leases, tenants, unit_status records
-    # Merge signed_at into token_row for the activation function
-    _activate_lease_from_signing({**token_row, "signed_at": signed_at}, sb)
+    # Merge signed_at and the PDF URL into token_row for the activation function
+    await _activate_lease_from_signing({**token_row, "signed_at": signed_at, "pdf_url": pdf_url}, sb)
 
     # Send the signed PDF back to the prospect if we have a URL
     if pdf_url:
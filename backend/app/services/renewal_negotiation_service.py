@@ -22,14 +22,15 @@ from typing import Any
 from anthropic import Anthropic, APIError
 
 from app.config import settings
+from app.database import supabase
+from app.services.context_loader import invalidate_tenant_context
 from app.services.renewal_config import RENEWAL_CONFIG
 
 log = logging.getLogger(__name__)
 
 
 def _sb():
-    from supabase import create_client
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 def _claude():
@@ -169,6 +170,7 @@ async def _send_to_tenant(whatsapp_number: str, message: str, lease_id: str, sb)
             "message_body": message,
             "intent_classification": "renewal_negotiation",
         }).execute()
+        invalidate_tenant_context(lease_id)
     except Exception as exc:
         log.warning("[RenewalNegotiation] Failed to log outbound conversation: %s", exc)
 
@@ -11,16 +11,14 @@ import logging
 from datetime import date, timedelta
 from typing import Any
 
-from supabase import create_client
-
-from app.config import settings
+from app.database import supabase
 from app.services.renewal_config import RENEWAL_CONFIG
 
 log = logging.getLogger(__name__)
 
 
 def _sb():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 # ── Feature Extractors ───────────────────────────────────────────────────────
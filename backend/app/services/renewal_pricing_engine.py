@@ -10,9 +10,7 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from supabase import create_client
-
-from app.config import settings
+from app.database import supabase
 from app.services.renewal_config import RENEWAL_CONFIG
 from app.services.renewal_prediction_service import score_lease
 
@@ -20,7 +18,7 @@ log = logging.getLogger(__name__)
 
 
 def _sb():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 # ── Revenue Formula ──────────────────────────────────────────────────────────
@@ -14,9 +14,7 @@ import logging
 from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
-from supabase import create_client
-
-from app.config import settings
+from app.database import supabase
 from app.services.renewal_config import RENEWAL_CONFIG
 from app.services.renewal_pricing_engine import run_pricing_simulation
 from app.services.renewal_content_generator import generate_renewal_offer
@@ -26,7 +24,7 @@ log = logging.getLogger(__name__)
 
 
 def _sb():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 def _now() -> str:
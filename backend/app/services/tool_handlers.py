@@ -5,16 +5,19 @@ from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from typing import Any
 
-from supabase import create_client
-
-from app.config import settings
-from app.services.context_loader import TenantContext, log_agent_action, update_conversation_context
+from app.database import supabase
+from app.services.context_loader import (
+    TenantContext,
+    invalidate_tenant_context,
+    log_agent_action,
+    update_conversation_context,
+)
 
 logger = logging.getLogger(__name__)
 
 
 def _sb():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase
 
 
 @dataclass
@@ -30,7 +33,7 @@ class ToolResult:
 # Tool definitions for Claude
 # ---------------------------------------------------------------------------
 
-AGENT_TOOLS = [
+AGENT_TOOLS = (
     {
         "name": "get_rent_status",
         "description": (
@@ -165,7 +168,7 @@ AGENT_TOOLS = [
             "required": ["new_level", "reason"],
         },
     },
-]
+)
 
 
 # ---------------------------------------------------------------------------
@@ -175,16 +178,20 @@ AGENT_TOOLS = [
 async def execute_tool(tool_name: str, tool_input: dict[str, Any], ctx: TenantContext) -> ToolResult:
     if tool_name == "get_rent_status":
         return await _get_rent_status(tool_input, ctx)
-    elif tool_name == "schedule_maintenance":
-        return await _schedule_maintenance(tool_input, ctx)
-    elif tool_name == "issue_legal_notice":
-        return await _issue_legal_notice(tool_input, ctx)
-    elif tool_name == "record_renewal_decision":
-        return await _record_renewal_decision(tool_input, ctx)
-    elif tool_name == "update_escalation_level":
-        return await _update_escalation_level(tool_input, ctx)
-    else:
-        return ToolResult(success=False, error=f"Unknown tool: {tool_name}")
+    try:
+        if tool_name == "schedule_maintenance":
+            return await _schedule_maintenance(tool_input, ctx)
+        elif tool_name == "issue_legal_notice":
+            return await _issue_legal_notice(tool_input, ctx)
+        elif tool_name == "record_renewal_decision":
+            return await _record_renewal_decision(tool_input, ctx)
+        elif tool_name == "update_escalation_level":
+            return await _update_escalation_level(tool_input, ctx)
+        else:
+            return ToolResult(success=False, error=f"Unknown tool: {tool_name}")
+    finally:
+        # Every other tool writes rows that are part of the tenant context
+        invalidate_tenant_context(ctx.lease.id)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,11 @@
+-- ============================================================
+-- Signed signature images in Storage
+-- Migration: 002_signing_signature_url.sql
+-- Run in Supabase SQL editor or via psql
+-- ============================================================
+
+-- The tenant's signature PNG is now uploaded to the leases-signed bucket
+-- (signatures/<token>.png) and only its public URL is kept on the token row.
+-- signature_data_url stays nullable and is only populated when the signed
+-- PDF could not be stored, so the frontend can still re-render it.
+ALTER TABLE signing_tokens ADD COLUMN IF NOT EXISTS signature_url TEXT;
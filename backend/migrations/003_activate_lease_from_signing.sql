@@ -0,0 +1,78 @@
+-- ============================================================
+-- Lease activation after signing, as one transaction
+-- Migration: 003_activate_lease_from_signing.sql
+-- Run in Supabase SQL editor or via psql
+-- ============================================================
+
+-- Called via PostgREST RPC from app.routes.signing._activate_lease_from_signing.
+-- Creates the lease, the primary tenant and the unit_status row for a signed
+-- token, and notifies the unit's landlord — one round trip, all-or-nothing.
+-- Returns the new lease id, or NULL when the token has no application/unit.
+CREATE OR REPLACE FUNCTION activate_lease_from_signing(
+    p_token_id UUID,
+    p_pdf_url  TEXT DEFAULT NULL
+) RETURNS UUID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_token       signing_tokens%ROWTYPE;
+    v_unit_id     UUID;
+    v_full_name   TEXT;
+    v_email       TEXT;
+    v_landlord_id UUID;
+    v_start_date  DATE;
+    v_lease_id    UUID;
+BEGIN
+    -- signing_tokens is looked up by its primary key, so no extra index is needed
+    SELECT * INTO v_token FROM signing_tokens WHERE id = p_token_id;
+    IF NOT FOUND OR v_token.application_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT la.unit_id, la.full_name, la.email, u.landlord_id
+      INTO v_unit_id, v_full_name, v_email, v_landlord_id
+      FROM lease_applications la
+      LEFT JOIN units u ON u.id = la.unit_id
+     WHERE la.id = v_token.application_id;
+    IF v_unit_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    v_start_date := COALESCE(v_token.signed_at, NOW())::DATE;
+
+    INSERT INTO leases (unit_id, start_date, monthly_rent, status, lease_document_url)
+    VALUES (v_unit_id, v_start_date, COALESCE(v_token.monthly_rent, 0), 'active', p_pdf_url)
+    RETURNING id INTO v_lease_id;
+
+    INSERT INTO tenants (lease_id, full_name, email, whatsapp_number, is_primary_tenant)
+    VALUES (
+        v_lease_id,
+        COALESCE(v_full_name, v_token.prospect_name, 'New Tenant'),
+        v_email,
+        v_token.prospect_phone,
+        TRUE
+    );
+
+    INSERT INTO unit_status (unit_id, occupancy_status, move_in_date)
+    VALUES (v_unit_id, 'occupied', v_start_date)
+    ON CONFLICT (unit_id) DO UPDATE
+        SET occupancy_status = EXCLUDED.occupancy_status,
+            move_in_date     = EXCLUDED.move_in_date;
+
+    IF v_landlord_id IS NOT NULL THEN
+        INSERT INTO landlord_notifications (landlord_id, lease_id, notification_type, message, requires_signature)
+        VALUES (
+            v_landlord_id,
+            v_lease_id,
+            'general',
+            COALESCE(v_full_name, v_token.prospect_name, 'New Tenant')
+                || ' has signed their tenancy agreement'
+                || COALESCE(' for ' || NULLIF(v_token.unit_address, ''), '')
+                || '. The lease is now active.',
+            FALSE
+        );
+    END IF;
+
+    RETURN v_lease_id;
+END;
+$$;
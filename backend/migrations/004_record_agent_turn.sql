@@ -0,0 +1,45 @@
+-- ============================================================
+-- Per-turn agent writes, as one transaction
+-- Migration: 004_record_agent_turn.sql
+-- Run in Supabase SQL editor or via psql
+-- ============================================================
+
+-- Called via PostgREST RPC from app.services.context_loader.record_agent_turn
+-- at the end of every tenant WhatsApp turn. Logs the outbound reply, the
+-- agent error (if any) and the refreshed conversation_context row in a single
+-- round trip instead of one request per table.
+CREATE OR REPLACE FUNCTION record_agent_turn(
+    p_lease_id              UUID,
+    p_reply                 TEXT,
+    p_intent_classification TEXT  DEFAULT NULL,
+    p_summary               TEXT  DEFAULT NULL,
+    p_open_threads          JSONB DEFAULT NULL,
+    p_error                 TEXT  DEFAULT NULL
+) RETURNS UUID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_conversation_id UUID;
+BEGIN
+    IF p_error IS NOT NULL THEN
+        INSERT INTO agent_actions (lease_id, action_category, action_description, tools_called, confidence_score)
+        VALUES (p_lease_id, 'other', 'Agent error: ' || p_error, '[]'::jsonb, 0);
+    END IF;
+
+    INSERT INTO conversations (lease_id, direction, message_body, intent_classification)
+    VALUES (p_lease_id, 'outbound', p_reply, p_intent_classification)
+    RETURNING id INTO v_conversation_id;
+
+    -- conversation_context.lease_id is UNIQUE, so the upsert is an index lookup
+    IF p_summary IS NOT NULL THEN
+        INSERT INTO conversation_context (lease_id, summary, open_threads, last_updated)
+        VALUES (p_lease_id, p_summary, COALESCE(p_open_threads, '{}'::jsonb), NOW())
+        ON CONFLICT (lease_id) DO UPDATE
+            SET summary      = EXCLUDED.summary,
+                open_threads = EXCLUDED.open_threads,
+                last_updated = EXCLUDED.last_updated;
+    END IF;
+
+    RETURN v_conversation_id;
+END;
+$$;
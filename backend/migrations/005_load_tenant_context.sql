@@ -0,0 +1,67 @@
+-- ============================================================
+-- Tenant agent context, as one query
+-- Migration: 005_load_tenant_context.sql
+-- Run in Supabase SQL editor or via psql
+-- ============================================================
+
+-- Called via PostgREST RPC from app.services.context_loader.load_tenant_context
+-- on every inbound tenant WhatsApp message. Returns the tenant → lease → unit
+-- chain, the unit's landlord and the lease's recent/open related rows as one
+-- JSON document, instead of nine sequential PostgREST requests. Each key holds
+-- the same rows (and order) the per-table selects used to return; NULL when
+-- the number has no tenant with a lease on a unit.
+CREATE OR REPLACE FUNCTION load_tenant_context(
+    p_whatsapp_number TEXT
+) RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'tenant',   to_jsonb(t),
+        'lease',    to_jsonb(l),
+        'unit',     to_jsonb(u),
+        'landlord', (SELECT to_jsonb(ll) FROM landlords ll WHERE ll.id = u.landlord_id),
+        'conversations', COALESCE((
+            SELECT jsonb_agg(to_jsonb(c) ORDER BY c."timestamp" DESC)
+              FROM (SELECT * FROM conversations
+                     WHERE lease_id = l.id
+                     ORDER BY "timestamp" DESC
+                     LIMIT 10) c
+        ), '[]'::jsonb),
+        'conversation_context', (
+            SELECT to_jsonb(cc) FROM conversation_context cc WHERE cc.lease_id = l.id
+        ),
+        'payments', COALESCE((
+            SELECT jsonb_agg(to_jsonb(p) ORDER BY p.due_date DESC)
+              FROM (SELECT * FROM payments
+                     WHERE lease_id = l.id
+                     ORDER BY due_date DESC
+                     LIMIT 6) p
+        ), '[]'::jsonb),
+        'payment_plan', (
+            SELECT to_jsonb(pp) FROM payment_plans pp
+             WHERE pp.lease_id = l.id AND pp.status = 'active'
+             LIMIT 1
+        ),
+        'maintenance_requests', COALESCE((
+            SELECT jsonb_agg(to_jsonb(mr) ORDER BY mr.created_at DESC)
+              FROM maintenance_requests mr
+             WHERE mr.lease_id = l.id AND mr.status IN ('open', 'assigned', 'in_progress')
+        ), '[]'::jsonb),
+        'legal_actions', COALESCE((
+            SELECT jsonb_agg(to_jsonb(la) ORDER BY la.issued_at DESC)
+              FROM legal_actions la
+             WHERE la.lease_id = l.id AND la.status IN ('issued', 'acknowledged')
+        ), '[]'::jsonb),
+        'disputes', COALESCE((
+            SELECT jsonb_agg(to_jsonb(d) ORDER BY d.opened_at DESC)
+              FROM disputes d
+             WHERE d.lease_id = l.id AND d.status IN ('open', 'under_review')
+        ), '[]'::jsonb)
+    )
+      FROM tenants t
+      JOIN leases l ON l.id = t.lease_id
+      JOIN units u  ON u.id = l.unit_id
+     WHERE t.whatsapp_number = p_whatsapp_number
+     LIMIT 1;
+$$;
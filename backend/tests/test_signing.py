@@ -0,0 +1,36 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://u:p@localhost/db")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test")
+
+from pypdf import PdfReader  # noqa: E402
+
+from app.routes.signing import _render_signed_lease_pdf  # noqa: E402
+
+TOKEN_ROW = {
+    "id": "00000000-0000-0000-0000-000000000000",
+    "prospect_name": "Jane Doe",
+    "unit_address": "1 Test Street",
+    "monthly_rent": 1200,
+    "lease_content": "1. TERM\nThe tenancy runs for twelve months.",
+}
+
+
+def _pdf_text(buf) -> str:
+    return "\n".join(page.extract_text() for page in PdfReader(buf).pages)
+
+
+def test_conversational_signature_renders_typed_text():
+    sig_text = 'Digitally signed via WhatsApp on 01 January 2026 at 12:00 UTC.\nConsent statement: "I agree & sign"'
+    text = _pdf_text(_render_signed_lease_pdf(TOKEN_ROW, None, sig_text=sig_text))
+
+    assert "AWAITING TENANT SIGNATURE" not in text
+    assert "Digitally signed via WhatsApp" in text
+    assert "I agree & sign" in text
+
+
+def test_missing_signature_shows_placeholder():
+    text = _pdf_text(_render_signed_lease_pdf(TOKEN_ROW, None))
+
+    assert "AWAITING TENANT SIGNATURE" in text